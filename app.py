@@ -1,23 +1,39 @@
 """
 FastAPI backend server for Campus Compass
 """
-from typing import List, Dict, Any
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from src.retriever import answer_question
+from src.retriever import answer_question, start_index_watcher, index_status, tenant_indexes
+from src.tenants import UnknownTenant, TENANT_ID_RE
+from src.admission import llm_admission, Overloaded
+from src.llm_cache import llm_cache
 import os
 from pathlib import Path
 from dotenv import load_dotenv
 
 load_dotenv()
 
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pick up indexes published by rebuild.sh without a restart
+    start_index_watcher()
+    yield
+
+
 app = FastAPI(
     title="Campus Compass API",
     description="RAG-based question answering system for campus information",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware to allow frontend requests
@@ -40,11 +56,16 @@ app.add_middleware(
 
 class QuestionRequest(BaseModel):
     question: str
+    session_id: Optional[str] = None  # pass the same ID on follow-up questions
+    tenant_id: Optional[str] = None   # college whose documents to search (default index if omitted)
 
 
 class AnswerResponse(BaseModel):
     answer: str
     sources: List[Dict[str, Any]]
+    session_id: Optional[str] = None
+    tenant_id: Optional[str] = None
+    tier: str = "llm"  # which path answered: "llm", "precomputed", "extractive", "none" (no match) or "error"
 
 
 # Serve frontend static files if they exist
@@ -87,15 +108,19 @@ else:
 
 
 @app.post("/api/answer", response_model=AnswerResponse)
-async def get_answer(request: QuestionRequest):
+async def get_answer(request: QuestionRequest, http_response: Response,
+                     x_tenant_id: Optional[str] = Header(None)):
     """
     Answer a question using the RAG system.
     
     Args:
-        request: QuestionRequest containing the question string
+        request: QuestionRequest containing the question string, an
+            optional session_id for follow-up questions and an optional
+            tenant_id (or X-Tenant-ID header) selecting the college
         
     Returns:
-        AnswerResponse with answer and source citations
+        AnswerResponse with answer and source citations; the answering
+        tier is also sent in the X-Answer-Tier header
     """
     try:
         if not request.question or not request.question.strip():
@@ -105,7 +130,16 @@ async def get_answer(request: QuestionRequest):
         if len(request.question) > 1000:
             raise HTTPException(status_code=400, detail="Question is too long. Please keep it under 1000 characters.")
         
-        response = answer_question(request.question.strip())
+        if request.session_id is not None and not 0 < len(request.session_id) <= 128:
+            raise HTTPException(status_code=400, detail="session_id must be 1-128 characters.")
+        
+        tenant_id = request.tenant_id or x_tenant_id
+        if tenant_id is not None and not TENANT_ID_RE.match(tenant_id):
+            raise HTTPException(status_code=400, detail="tenant_id must be 1-64 letters, digits, '-' or '_'.")
+        
+        # Run in the threadpool so concurrent requests are not serialised on the event loop
+        response = await run_in_threadpool(answer_question, request.question.strip(),
+                                           session_id=request.session_id, tenant_id=tenant_id)
         
         # Ensure response has required fields
         if "answer" not in response:
@@ -113,13 +147,27 @@ async def get_answer(request: QuestionRequest):
         if "sources" not in response:
             response["sources"] = []
         
+        tier = response.get("tier", "llm")
+        http_response.headers["X-Answer-Tier"] = tier
         return AnswerResponse(
             answer=response["answer"],
-            sources=response["sources"]
+            sources=response["sources"],
+            session_id=request.session_id,
+            tenant_id=tenant_id,
+            tier=tier
         )
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except UnknownTenant as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Overloaded as e:
+        # Shed load quickly instead of letting requests pile up behind the LLM
+        raise HTTPException(
+            status_code=503,
+            detail=f"Campus Compass is busy right now ({e}). Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         error_msg = str(e)
         print(f"❌ Error in /api/answer: {error_msg}")
@@ -129,6 +177,31 @@ async def get_answer(request: QuestionRequest):
         )
 
 
+@app.get("/api/admin/index")
+async def get_index_status(x_admin_token: Optional[str] = Header(None)):
+    """
+    Report which index version is live and which versions are on disk.
+    
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set.
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return index_status()
+
+
+@app.get("/api/admin/metrics")
+async def get_metrics(x_admin_token: Optional[str] = Header(None)):
+    """
+    Capacity metrics: LLM concurrency, queue depth, rejection counts, response-cache hits
+    and per-tenant index warm/cold hits.
+    
+    Requires the X-Admin-Token header when ADMIN_TOKEN is set.
+    """
+    if ADMIN_TOKEN and x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    return {"llm": llm_admission.stats(), "llm_cache": llm_cache.stats(), "tenants": tenant_indexes.stats()}
+
+
 if __name__ == "__main__":
     import uvicorn
     import socket
@@ -1,12 +1,25 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { Send, BookOpen, Sparkles, Loader2, Copy, Check, Compass } from 'lucide-react';
 
+// crypto.randomUUID only exists in secure contexts (HTTPS or localhost); the
+// session ID just has to be unique per tab, so fall back to a random string
+const newSessionId = () =>
+  typeof crypto !== 'undefined' && typeof crypto.randomUUID === 'function'
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+
 export default function CampusCompass() {
   const [question, setQuestion] = useState('');
   const [messages, setMessages] = useState([]);
   const [isLoading, setIsLoading] = useState(false);
   const [copiedIndex, setCopiedIndex] = useState(null);
   const messagesEndRef = useRef(null);
+  // One conversation per page load so follow-up questions keep their context
+  // (created on first render only, not on every re-render)
+  const sessionId = useRef(null);
+  if (sessionId.current === null) {
+    sessionId.current = newSessionId();
+  }
 
   // Get API URL from environment variable or use default
   // Try to detect if we're in development (Vite) or production
@@ -59,9 +72,13 @@ export default function CampusCompass() {
       const response = await fetch(`${API_URL}/api/answer`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify({ question: currentQuestion })
+        body: JSON.stringify({ question: currentQuestion, session_id: sessionId.current })
       });
 
+      if (response.status === 503) {
+        const retryAfter = response.headers.get('Retry-After') || 'a few';
+        throw new Error(`API busy: 503 (retry in ${retryAfter} seconds)`);
+      }
       if (!response.ok) {
         throw new Error(`API error: ${response.status} ${response.statusText}`);
       }
@@ -87,6 +104,8 @@ export default function CampusCompass() {
         errorMessage.content = `❌ Cannot connect to the backend server at ${API_URL}. Please make sure the backend is running. Start it with: python app.py`;
       } else if (error.message.includes('404')) {
         errorMessage.content = `❌ API endpoint not found. Please check that the backend is running and the API URL is correct: ${API_URL}`;
+      } else if (error.message.includes('API busy')) {
+        errorMessage.content = `⏳ Lots of students are asking questions right now. Please try again in a moment (${error.message.split('(')[1].replace(')', '')}).`;
       } else if (error.message.includes('500')) {
         errorMessage.content = `❌ Server error. The backend encountered an issue processing your question. Please try again or rephrase your question.`;
       } else {
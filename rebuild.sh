@@ -31,5 +31,16 @@ fi
 echo ""
 echo "✅ Vectorstore rebuild complete!"
 echo ""
-echo "🚀 You can now restart your server with: python app.py"
+
+# Step 3: Precompute answers for frequent questions (needs HF_TOKEN; optional)
+echo "📦 Step 3: Precomputing answers for frequent questions..."
+python -m src.answer_store
+
+if [ $? -ne 0 ]; then
+    echo "⚠️  Could not precompute answers. The server will answer every question live."
+fi
+
+echo ""
+echo "🚀 A running server picks up the new index version automatically (no restart needed)."
+echo "   Check which version is live with: curl http://localhost:8000/api/admin/index"
 
@@ -0,0 +1,103 @@
+# src/admission.py
+"""
+Admission control for LLM calls.
+
+At most LLM_MAX_CONCURRENCY requests talk to the router at once. Up to
+LLM_MAX_QUEUE more may wait for a slot, each for at most LLM_QUEUE_TIMEOUT
+seconds. Anything beyond that is rejected straight away with `Overloaded`,
+which the API turns into a 503 with Retry-After, instead of letting
+latency grow without bound.
+"""
+import os
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "16"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "10"))
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot get an LLM slot in time."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Bounded concurrency + bounded wait queue with per-request deadlines."""
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, max_queue: int = LLM_MAX_QUEUE,
+                 queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.upstream_rate_limited = 0
+        self.avg_call_seconds = 2.0  # EWMA of slot hold time, used for Retry-After
+
+    def retry_after(self) -> int:
+        """Rough seconds until the current queue drains."""
+        backlog = (self.waiting + 1) / max(self.max_concurrency, 1)
+        return max(1, math.ceil(backlog * self.avg_call_seconds))
+
+    @contextmanager
+    def slot(self):
+        """Hold one LLM slot for the duration of the block, or raise Overloaded."""
+        with self._cond:
+            if self.active >= self.max_concurrency or self.waiting:
+                if self.waiting >= self.max_queue:
+                    self.rejected_queue_full += 1
+                    raise Overloaded("LLM queue is full", self.retry_after())
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.active >= self.max_concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.rejected_timeout += 1
+                            raise Overloaded("Timed out waiting for an LLM slot", self.retry_after())
+                        self._cond.wait(remaining)
+                finally:
+                    self.waiting -= 1
+            self.active += 1
+            self.admitted += 1
+
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self.avg_call_seconds = 0.8 * self.avg_call_seconds + 0.2 * (time.monotonic() - start)
+                self._cond.notify()
+
+    def record_rate_limited(self):
+        with self._cond:
+            self.upstream_rate_limited += 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "max_concurrency": self.max_concurrency,
+                "max_queue": self.max_queue,
+                "queue_timeout": self.queue_timeout,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "admitted": self.admitted,
+                "rejected_queue_full": self.rejected_queue_full,
+                "rejected_timeout": self.rejected_timeout,
+                "upstream_rate_limited": self.upstream_rate_limited,
+                "avg_call_seconds": round(self.avg_call_seconds, 3),
+            }
+
+
+llm_admission = AdmissionController()
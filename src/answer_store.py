@@ -0,0 +1,180 @@
+# src/answer_store.py
+"""
+Precomputed answers for high-frequency questions.
+
+After an index build, `python -m src.answer_store` runs a curated list of
+frequent questions (by default the ones in TEST_QUESTIONS.md) through the
+normal retrieval + LLM path and saves the results next to the live index
+as `answers.pkl`. `/api/answer` then serves a question straight from this
+store when it matches a stored question exactly (after normalisation) or
+its embedding is a close enough nearest neighbour whose content words
+agree with the question's.
+"""
+import os
+import re
+import sys
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+import numpy as np  # pyright: ignore[reportMissingImports]
+
+from src.extractive import keywords
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+STORE_FILE = "answers.pkl"
+DEFAULT_QUESTION_FILES = [ROOT_DIR / "TEST_QUESTIONS.md", ROOT_DIR / "data" / "frequent_questions.txt"]
+MIN_SIMILARITY = float(os.getenv("ANSWER_STORE_MIN_SIM", "0.93"))  # cosine needed for a nearest-neighbour hit
+MIN_KEYWORD_OVERLAP = float(os.getenv("ANSWER_STORE_MIN_OVERLAP", "0.5"))  # Jaccard of content words, too
+CACHE_SIZE = int(os.getenv("ANSWER_STORE_CACHE_SIZE", "32"))  # stores kept in memory (one per index version)
+
+# Answers we should not pin: the model could not answer or the call failed
+UNSURE_MARKERS = ["don't know", "don’t know", "couldn’t find", "couldn't find", "❌"]
+
+
+def keywords_agree(a: set, b: set, min_overlap: float = MIN_KEYWORD_OVERLAP) -> bool:
+    """Content words overlap enough and the specific ones (with digits or dots) are the same."""
+    if not a or not b:
+        return a == b
+    specific = {w for w in a ^ b if "." in w or any(c.isdigit() for c in w)}
+    return not specific and len(a & b) / len(a | b) >= min_overlap
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+
+
+class AnswerStore:
+    """Lookup table of precomputed answers, keyed on normalised question and embedding."""
+
+    def __init__(self, entries, embed_model=None):
+        self.entries = entries
+        self.embed_model = embed_model
+        self.by_key = {e["key"]: e for e in entries}
+        self.vectors = np.stack([e["query_vector"] for e in entries]) if entries else None
+        self.keywords = [keywords(e["question"]) for e in entries]
+
+    def lookup_exact(self, question: str):
+        return self.by_key.get(normalize_question(question))
+
+    def lookup_nearest(self, question: str, query_vector, min_similarity: float = MIN_SIMILARITY,
+                       min_overlap: float = MIN_KEYWORD_OVERLAP):
+        """Closest entry to a unit-length query vector that is similar enough and asks about the same things.
+
+        Embeddings rate "B.Tech fee" and "M.Tech fee" as near-identical, so
+        the content words must overlap too, and numbers and dotted terms
+        ("m.tech", "2024") must match exactly.
+        """
+        if self.vectors is None:
+            return None
+        sims = self.vectors @ query_vector
+        words = keywords(question)
+        for i in np.argsort(-sims):
+            if sims[i] < min_similarity:
+                break
+            if keywords_agree(words, self.keywords[i], min_overlap):
+                return self.entries[i]
+        return None
+
+    def save(self, path: Path):
+        """Write atomically so a running server never reads a partial file."""
+        path = Path(path)
+        tmp = path.with_name(f".{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump({"embed_model": self.embed_model, "entries": self.entries}, f)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path):
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        return cls(data["entries"], data.get("embed_model"))
+
+
+# === Per-index cache (reloaded when answers.pkl changes) ===
+_cache = OrderedDict()  # answers.pkl path -> (mtime, AnswerStore), least recently used first
+_cache_lock = threading.Lock()
+
+
+def load_for_index(index_dir: Path):
+    """Return the AnswerStore published with an index version, or None."""
+    path = Path(index_dir) / STORE_FILE
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    with _cache_lock:
+        cached = _cache.get(str(path))
+        if cached and cached[0] == mtime:
+            _cache.move_to_end(str(path))
+            return cached[1]
+        # Keyed per path: the default index and every tenant keep their own store
+        store = AnswerStore.load(path)
+        _cache[str(path)] = (mtime, store)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return store
+
+
+# -------------------------
+# Offline build job
+# -------------------------
+def load_questions(paths):
+    """Read questions from Markdown lists (`1. **Question?**`) or plain text, one per line."""
+    questions = []
+    for path in paths:
+        path = Path(path)
+        if not path.exists():
+            continue
+        for line in path.read_text(encoding="utf-8").splitlines():
+            if path.suffix.lower() == ".md":
+                m = re.match(r"^\s*\d+\.\s+\*\*(.+?)\*\*", line)
+                line = m.group(1) if m else ""
+            line = line.strip()
+            if line and not line.startswith("#"):
+                questions.append(line)
+    return questions
+
+
+def build_answer_store(questions):
+    """Answer each question with the live index + LLM and publish answers.pkl next to it."""
+    from src import retriever
+
+    db, index_dir, label = retriever.resolve_index()
+    entries, seen = [], set()
+
+    for q in questions:
+        key = normalize_question(q)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+
+        results = db.similarity_search(q, k=retriever.TOP_K)
+        if not results:
+            continue
+        context = "\n\n".join(r.page_content for r in results)
+        raw_answer = retriever.hf_llama_inference(retriever.PROMPT.format(context=context, question=q),
+                                                  index_version=label)
+        if any(m in raw_answer.lower() for m in UNSURE_MARKERS):
+            print(f"⚠️  Skipping (no confident answer): {q}")
+            continue
+
+        entries.append({
+            "question": q,
+            "key": key,
+            "raw_answer": raw_answer,
+            "docs": results,
+            "query_vector": retriever.unit_vector(db.embeddings.embed_query(q)),
+        })
+        print(f"✅ Precomputed: {q}")
+
+    store = AnswerStore(entries, embed_model=retriever.embed_model_of(index_dir))
+    store.save(index_dir / STORE_FILE)
+    print(f"\n📦 Saved {len(entries)} precomputed answers to {index_dir / STORE_FILE}")
+    return store
+
+
+if __name__ == "__main__":
+    files = sys.argv[1:] or DEFAULT_QUESTION_FILES
+    build_answer_store(load_questions(files))
@@ -0,0 +1,242 @@
+# src/backends.py
+"""
+Vector-store backends behind one interface.
+
+Both backends wrap a LangChain vector store and expose the same methods, so
+the retriever, answer store and benchmark do not care which one built the
+index. `meta.pkl` in each index directory records the backend name;
+`load_index` uses it to pick the implementation (indexes built before this
+field existed are FAISS).
+
+Chunk IDs ("<source>#<chunk>") double as vector-store IDs, so `delete`
+works the same way on both backends. Scores are L2 distances (lower is
+closer) for both.
+"""
+import pickle
+from pathlib import Path
+import numpy as np  # pyright: ignore[reportMissingImports]
+
+META_FILE = "meta.pkl"
+DEFAULT_BACKEND = "faiss"
+
+
+def chunk_id_for(metadata) -> str:
+    """Stable ID for a chunk, built from its source file and chunk number."""
+    return f"{metadata.get('source', 'Unknown')}#{metadata.get('chunk', 0)}"
+
+
+class VectorBackend:
+    """Interface every backend implements."""
+
+    name = None
+
+    def __init__(self, store, path: Path):
+        self.store = store
+        self.path = Path(path)
+
+    # --- lifecycle ---
+    @classmethod
+    def build(cls, texts, vectors, metadatas, embedding, path):
+        """Create an index from precomputed vectors and persist it to `path`."""
+        raise NotImplementedError
+
+    @classmethod
+    def load(cls, path, embedding):
+        raise NotImplementedError
+
+    def save(self):
+        """Persist changes made with add/delete."""
+        raise NotImplementedError
+
+    # --- mutation ---
+    def add(self, texts, vectors, metadatas):
+        """Insert or replace chunks by their chunk ID; returns the IDs written."""
+        raise NotImplementedError
+
+    def delete(self, ids):
+        raise NotImplementedError
+
+    # --- search ---
+    @property
+    def embeddings(self):
+        return self.store.embeddings
+
+    def similarity_search(self, query: str, k: int = 4):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def similarity_search_by_vector(self, vector, k: int = 4):
+        return [doc for doc, _ in self.similarity_search_with_score_by_vector(vector, k)]
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4):
+        """[(Document, L2 distance)] closest first."""
+        raise NotImplementedError
+
+    def batch_search(self, vectors, k: int = 4):
+        """One result list of (Document, distance) per query vector."""
+        return [self.similarity_search_with_score_by_vector(v, k) for v in vectors]
+
+    def dump(self):
+        """All stored chunks as (ids, texts, vectors, metadatas), for rebuilding on another backend."""
+        raise NotImplementedError
+
+    def __len__(self):
+        raise NotImplementedError
+
+
+def _last_per_id(texts, vectors, metadatas):
+    """(ids, texts, vectors, metadatas) keeping only the last chunk for each repeated chunk ID."""
+    last = {chunk_id_for(m): n for n, m in enumerate(metadatas)}
+    keep = sorted(last.values())
+    return ([chunk_id_for(metadatas[n]) for n in keep], [texts[n] for n in keep],
+            [vectors[n] for n in keep], [metadatas[n] for n in keep])
+
+
+class FaissBackend(VectorBackend):
+    name = "faiss"
+
+    @classmethod
+    def build(cls, texts, vectors, metadatas, embedding, path):
+        from langchain_community.vectorstores import FAISS  # pyright: ignore[reportMissingImports]
+
+        ids = [chunk_id_for(m) for m in metadatas]
+        store = FAISS.from_embeddings(list(zip(texts, [list(map(float, v)) for v in vectors])), embedding,
+                                      metadatas=metadatas, ids=ids)
+        backend = cls(store, path)
+        backend.save()
+        return backend
+
+    @classmethod
+    def load(cls, path, embedding):
+        from langchain_community.vectorstores import FAISS  # pyright: ignore[reportMissingImports]
+
+        store = FAISS.load_local(str(path), embeddings=embedding, allow_dangerous_deserialization=True)
+        return cls(store, path)
+
+    def save(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.store.save_local(str(self.path))
+
+    def add(self, texts, vectors, metadatas):
+        ids, texts, vectors, metadatas = _last_per_id(texts, vectors, metadatas)
+        # FAISS refuses IDs it already holds; replace them like Chroma's upsert does
+        existing = set(self.store.index_to_docstore_id.values())
+        stale = [i for i in ids if i in existing]
+        if stale:
+            self.store.delete(stale)
+        self.store.add_embeddings(list(zip(texts, [list(map(float, v)) for v in vectors])),
+                                  metadatas=metadatas, ids=ids)
+        return ids
+
+    def delete(self, ids):
+        self.store.delete(list(ids))
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4):
+        return self.store.similarity_search_with_score_by_vector(list(map(float, vector)), k=k)
+
+    def batch_search(self, vectors, k: int = 4):
+        # One FAISS call for the whole batch instead of one per query
+        distances, indices = self.store.index.search(np.asarray(vectors, dtype="float32"), k)
+        out = []
+        for row_d, row_i in zip(distances, indices):
+            hits = []
+            for dist, i in zip(row_d, row_i):
+                if i == -1:
+                    continue
+                doc = self.store.docstore.search(self.store.index_to_docstore_id[i])
+                hits.append((doc, float(dist)))
+            out.append(hits)
+        return out
+
+    def dump(self):
+        n = self.store.index.ntotal
+        vectors = self.store.index.reconstruct_n(0, n)
+        ids = [self.store.index_to_docstore_id[i] for i in range(n)]
+        docs = [self.store.docstore.search(i) for i in ids]
+        return ids, [d.page_content for d in docs], vectors, [d.metadata for d in docs]
+
+    def __len__(self):
+        return self.store.index.ntotal
+
+
+class ChromaBackend(VectorBackend):
+    name = "chroma"
+    collection_name = "campus_compass"
+
+    @classmethod
+    def _open(cls, path, embedding):
+        from langchain_community.vectorstores import Chroma  # pyright: ignore[reportMissingImports]
+
+        return Chroma(collection_name=cls.collection_name, embedding_function=embedding,
+                      persist_directory=str(path), collection_metadata={"hnsw:space": "l2"})
+
+    @classmethod
+    def build(cls, texts, vectors, metadatas, embedding, path):
+        backend = cls(cls._open(path, embedding), path)
+        backend.add(texts, vectors, metadatas)
+        return backend
+
+    @classmethod
+    def load(cls, path, embedding):
+        return cls(cls._open(path, embedding), path)
+
+    def save(self):
+        pass  # Chroma writes through to persist_directory
+
+    def add(self, texts, vectors, metadatas, batch_size: int = 1000):
+        ids, texts, vectors, metadatas = _last_per_id(texts, vectors, metadatas)
+        vectors = [list(map(float, v)) for v in vectors]
+        for i in range(0, len(ids), batch_size):
+            self.store._collection.upsert(ids=ids[i:i + batch_size], embeddings=vectors[i:i + batch_size],
+                                          documents=texts[i:i + batch_size], metadatas=metadatas[i:i + batch_size])
+        return ids
+
+    def delete(self, ids):
+        self.store.delete(ids=list(ids))
+
+    def similarity_search_with_score_by_vector(self, vector, k: int = 4):
+        return self.store.similarity_search_by_vector_with_relevance_scores(list(map(float, vector)), k=k)
+
+    def batch_search(self, vectors, k: int = 4):
+        from langchain_core.documents import Document  # pyright: ignore[reportMissingImports]
+
+        res = self.store._collection.query(query_embeddings=[list(map(float, v)) for v in vectors], n_results=k,
+                                           include=["documents", "metadatas", "distances"])
+        return [
+            [(Document(page_content=t, metadata=m or {}), float(d)) for t, m, d in zip(texts, metas, dists)]
+            for texts, metas, dists in zip(res["documents"], res["metadatas"], res["distances"])
+        ]
+
+    def dump(self):
+        data = self.store._collection.get(include=["documents", "metadatas", "embeddings"])
+        return data["ids"], data["documents"], np.asarray(data["embeddings"], dtype="float32"), data["metadatas"]
+
+    def __len__(self):
+        return self.store._collection.count()
+
+
+BACKENDS = {b.name: b for b in (FaissBackend, ChromaBackend)}
+
+
+def get_backend(name: str):
+    try:
+        return BACKENDS[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown vector store backend: {name}. Choose from {sorted(BACKENDS)}") from None
+
+
+def read_meta(path) -> dict:
+    meta_file = Path(path) / META_FILE
+    if not meta_file.exists():
+        return {}
+    with open(meta_file, "rb") as f:
+        return pickle.load(f)
+
+
+def write_meta(path, embed_model: str, backend: str):
+    with open(Path(path) / META_FILE, "wb") as f:
+        pickle.dump({"embed_model": embed_model, "backend": backend}, f)
+
+
+def load_index(path, embedding):
+    """Load an index directory with the backend recorded in its meta.pkl."""
+    return get_backend(read_meta(path).get("backend", DEFAULT_BACKEND)).load(path, embedding)
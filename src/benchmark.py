@@ -0,0 +1,152 @@
+# src/benchmark.py
+"""
+Compare vector-store backends on the same data and query set.
+
+Takes every chunk (text, vector, metadata) from the live index, rebuilds it
+on each backend in a temp directory, then runs the same queries against
+each one and reports build/load time, memory, per-query and batch latency,
+and recall@k against an exact brute-force search.
+
+    python -m src.benchmark
+    python -m src.benchmark --backends faiss,chroma --k 5 --questions TEST_QUESTIONS.md --json bench.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import resource
+import numpy as np  # pyright: ignore[reportMissingImports]
+
+from src import backends
+from src.answer_store import load_questions, DEFAULT_QUESTION_FILES
+
+
+def rss_mb() -> float:
+    """Current resident memory of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # macOS/BSD: peak RSS only (bytes on macOS, KB elsewhere)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 1024
+
+
+def exact_distances(vectors, queries):
+    """Squared L2 distance from every query to every stored vector."""
+    vectors, queries = vectors.astype("float64"), queries.astype("float64")
+    return (queries ** 2).sum(1)[:, None] - 2 * queries @ vectors.T + (vectors ** 2).sum(1)[None, :]
+
+
+def percentile(values, p):
+    return float(np.percentile(values, p)) if values else 0.0
+
+
+def recall_at_k(hits, distances, kth, row_of, k):
+    """Share of returned chunks that are within the exact k-th nearest distance.
+
+    Compared by distance rather than by ID because the corpus contains
+    duplicate chunks, and any of a set of tied vectors is a correct answer.
+    """
+    scores = []
+    for q, got in enumerate(hits):
+        ok = sum(1 for d, _ in got if distances[q, row_of[backends.chunk_id_for(d.metadata)]] <= kth[q] + 1e-4)
+        scores.append(ok / k)
+    return float(np.mean(scores)) if scores else 0.0
+
+
+def bench_backend(name, texts, vectors, metadatas, embedding, queries, truth, k):
+    backend_cls = backends.get_backend(name)
+    path = tempfile.mkdtemp(prefix=f"bench-{name}-")
+    try:
+        t0 = time.perf_counter()
+        backend_cls.build(texts, vectors, metadatas, embedding, path)
+        build_s = time.perf_counter() - t0
+
+        rss_before = rss_mb()
+        t0 = time.perf_counter()
+        backend = backend_cls.load(path, embedding)
+        load_s = time.perf_counter() - t0
+        backend.batch_search(queries[:1], k)  # warm-up
+        mem_mb = rss_mb() - rss_before
+
+        latencies, hits = [], []
+        for q in queries:
+            t0 = time.perf_counter()
+            hits.append(backend.similarity_search_with_score_by_vector(q, k))
+            latencies.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        batch_hits = backend.batch_search(queries, k)
+        batch_ms = (time.perf_counter() - t0) * 1000
+
+        recall = recall_at_k(hits, *truth, k)
+        batch_agree = np.mean([
+            [backends.chunk_id_for(d.metadata) for d, _ in a] == [backends.chunk_id_for(d.metadata) for d, _ in b]
+            for a, b in zip(hits, batch_hits)
+        ])
+        return {
+            "backend": name,
+            "chunks": len(backend),
+            "build_s": round(build_s, 3),
+            "load_s": round(load_s, 3),
+            "memory_mb": round(mem_mb, 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "batch_ms_per_query": round(batch_ms / max(len(queries), 1), 3),
+            f"recall@{k}": round(recall, 4),
+            "batch_matches_single": round(float(batch_agree), 4),
+        }
+    finally:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def run(backend_names, questions, k):
+    from src.retriever import get_vectorstore
+
+    db = get_vectorstore()
+    _, texts, vectors, metadatas = db.dump()
+    vectors = np.asarray(vectors, dtype="float32")
+    print(f"📚 {len(texts)} chunks from the live {db.name} index, {len(questions)} queries, k={k}\n")
+
+    queries = np.asarray([db.embeddings.embed_query(q) for q in questions], dtype="float32")
+    distances = exact_distances(vectors, queries)
+    kth = np.sort(distances, axis=1)[:, k - 1]
+    row_of = {backends.chunk_id_for(m): i for i, m in enumerate(metadatas)}
+    truth = (distances, kth, row_of)
+
+    results = []
+    for name in backend_names:
+        print(f"⏱️  Benchmarking {name}...")
+        results.append(bench_backend(name, texts, vectors, metadatas, db.embeddings, queries, truth, k))
+    return results
+
+
+def print_table(results):
+    if not results:
+        return
+    cols = list(results[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in cols]
+    print("\n" + "  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(cols, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare vector-store backends on the same query set.")
+    parser.add_argument("--backends", default=",".join(backends.BACKENDS), help="comma-separated backend names")
+    parser.add_argument("--questions", nargs="*", default=DEFAULT_QUESTION_FILES, help="question files (.md or .txt)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--json", help="also write results to this file")
+    args = parser.parse_args()
+
+    results = run([b.strip() for b in args.backends.split(",") if b.strip()], load_questions(args.questions), args.k)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Wrote {args.json}")
@@ -3,45 +3,64 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 
-from langchain_community.vectorstores import FAISS, Chroma
-from sentence_transformers import SentenceTransformer
-from src.ingest import ingest_all
+from src.ingest import ingest_all, write_profile, print_profile_summary
+from src import index_versions, tenants
+from src.backends import get_backend, write_meta
 from pathlib import Path
-import pickle
+import tempfile
+import time
+import argparse
+import numpy as np
 
 PERSIST_DIR = os.getenv("FAISS_DIR", "faiss_index")
 VECTORSTORE_TYPE = os.getenv("VECTORSTORE_TYPE", "faiss").lower()
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
 
-def build_vectorstore(persist: bool = True):
+def build_vectorstore(persist: bool = True, tenant_id: str = None):
+    """Ingest, embed and publish an index: the default one in FAISS_DIR, or a tenant's under TENANTS_DIR."""
+    from sentence_transformers import SentenceTransformer
+
     print(f"🔹 Using embedding model: {EMBED_MODEL}")
     model = SentenceTransformer(EMBED_MODEL)
-    docs = ingest_all()
+    profile = []
+    if tenant_id:
+        root = tenants.tenant_dir(tenant_id)
+        persist_dir = tenants.index_root(tenant_id)
+        docs = ingest_all(profile=profile, report=False, data_dir=root / "raw", out_dir=root / "processed")
+    else:
+        persist_dir = PERSIST_DIR
+        docs = ingest_all(profile=profile, report=False)
 
     texts = [d.page_content for d in docs]
     metas = [d.metadata for d in docs]
-    embeddings = model.encode(texts, show_progress_bar=True)
 
-    if VECTORSTORE_TYPE == "faiss":
-        # ✅ fix: zip texts and embeddings into pairs
-        text_embedding_pairs = list(zip(texts, embeddings))
-        vs = FAISS.from_embeddings(text_embedding_pairs, model, metadatas=metas)
+    # Encode file by file (docs are grouped by source) so the profile can show embedding cost per document
+    rows = {r["file"]: r for r in profile}
+    parts, start_idx = [], 0
+    for i in range(1, len(docs) + 1):
+        if i == len(docs) or metas[i]["source"] != metas[start_idx]["source"]:
+            start = time.perf_counter()
+            parts.append(model.encode(texts[start_idx:i], show_progress_bar=False))
+            rows[metas[start_idx]["source"]]["embed_seconds"] = round(time.perf_counter() - start, 4)
+            start_idx = i
+    embeddings = np.concatenate(parts) if parts else np.zeros((0, model.get_sentence_embedding_dimension()))
 
-        if persist:
-            Path(PERSIST_DIR).mkdir(parents=True, exist_ok=True)
-            vs.save_local(PERSIST_DIR)
-            with open(Path(PERSIST_DIR) / "meta.pkl", "wb") as f:
-                pickle.dump({"embed_model": EMBED_MODEL}, f)
-        print("✅ FAISS vectorstore built and persisted.")
-        return vs
+    write_profile(profile)
+    print_profile_summary(profile)
 
-    else:
-        # Optional: use Chroma instead
-        vs = Chroma.from_texts(texts, embedding_function=model, metadatas=metas, persist_directory=PERSIST_DIR)
-        if persist:
-            vs.persist()
-        print("✅ Chroma vectorstore built and persisted.")
-        return vs
+    backend_cls = get_backend(VECTORSTORE_TYPE)
+    # Write into a staging dir and publish atomically so a running server never sees partial files
+    staging = index_versions.staging_dir(persist_dir) if persist else Path(tempfile.mkdtemp())
+    vs = backend_cls.build(texts, embeddings, metas, embedding=None, path=staging)
+    write_meta(staging, embed_model=EMBED_MODEL, backend=backend_cls.name)
+
+    if persist:
+        version = index_versions.publish(persist_dir, staging)
+        print(f"✅ {backend_cls.name} vectorstore built and published as version {version} in {persist_dir}.")
+    return vs
 
 if __name__ == "__main__":
-    build_vectorstore(persist=True)
+    parser = argparse.ArgumentParser(description="Build and publish a vector index.")
+    parser.add_argument("--tenant", help="build tenants/<id>/index from tenants/<id>/raw instead of the default index")
+    args = parser.parse_args()
+    build_vectorstore(persist=True, tenant_id=args.tenant)
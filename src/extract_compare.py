@@ -0,0 +1,88 @@
+# src/extract_compare.py
+"""
+Per-file speed and text-parity comparison of the PDF text-layer extractors.
+
+Runs the "fast" path (PyMuPDF, pdfplumber only on table-like pages) and the
+pure pdfplumber path over every PDF in data/raw, without OCR, and reports
+time, characters, empty pages (which would go to OCR) and how closely the
+two outputs agree.
+
+    python -m src.extract_compare
+    python -m src.extract_compare --json extract_compare.json
+"""
+import re
+import json
+import time
+import argparse
+from collections import Counter
+from pathlib import Path
+
+from src.utils import extract_text_layer
+from src.ingest import DATA_DIR
+
+
+def word_parity(a: str, b: str) -> float:
+    """Share of words the two texts have in common (order-insensitive, 1.0 = same words)."""
+    wa, wb = Counter(re.findall(r"\w+", a.lower())), Counter(re.findall(r"\w+", b.lower()))
+    total = max(sum(wa.values()), sum(wb.values()))
+    return sum((wa & wb).values()) / total if total else 1.0
+
+
+def compare_file(path: Path) -> dict:
+    row = {"file": path.name}
+    texts = {}
+    for mode in ("fast", "pdfplumber"):
+        t0 = time.perf_counter()
+        try:
+            pages = extract_text_layer(path, mode)
+        except Exception as e:
+            row[f"{mode}_error"] = str(e)
+            pages = []
+        row[f"{mode}_s"] = round(time.perf_counter() - t0, 3)
+        texts[mode] = "\n".join(t for t, _, _ in pages)
+        row[f"{mode}_chars"] = len(texts[mode])
+        row[f"{mode}_empty_pages"] = sum(1 for t, _, _ in pages if not t.strip())
+        if mode == "fast":
+            row["pages"] = len(pages)
+            row["plumber_pages_in_fast"] = sum(1 for _, m, _ in pages if m == "pdfplumber")
+    row["speedup"] = round(row["pdfplumber_s"] / row["fast_s"], 1) if row["fast_s"] else None
+    row["parity"] = round(word_parity(texts["fast"], texts["pdfplumber"]), 3)
+    return row
+
+
+def print_table(rows):
+    cols = ["file", "pages", "fast_s", "pdfplumber_s", "speedup", "fast_chars", "pdfplumber_chars",
+            "fast_empty_pages", "plumber_pages_in_fast", "parity"]
+    short = {r["file"]: (r["file"][:40] + "…") if len(r["file"]) > 41 else r["file"] for r in rows}
+    widths = [max(len(c), *(len(str(short[r["file"]] if c == "file" else r.get(c, ""))) for r in rows)) for c in cols]
+    print("\n" + "  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    print("  ".join("-" * w for w in widths))
+    for r in rows:
+        print("  ".join(str(short[r["file"]] if c == "file" else r.get(c, "")).ljust(w) for c, w in zip(cols, widths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare PyMuPDF and pdfplumber text extraction over data/raw.")
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--json", help="also write per-file results to this file")
+    args = parser.parse_args()
+
+    rows = [compare_file(p) for p in sorted(Path(args.data_dir).glob("*.pdf"))]
+    if not rows:
+        raise SystemExit(f"❌ No PDFs found in {args.data_dir}")
+    print_table(rows)
+
+    fast_total = sum(r["fast_s"] for r in rows)
+    plumber_total = sum(r["pdfplumber_s"] for r in rows)
+    low_parity = [r for r in rows if r["parity"] < 0.95]
+    print(f"\n📊 {len(rows)} PDFs: fast {fast_total:.1f}s vs pdfplumber {plumber_total:.1f}s "
+          f"({plumber_total / fast_total:.1f}x faster)" if fast_total else "")
+    print(f"   Mean word parity: {sum(r['parity'] for r in rows) / len(rows):.3f}; "
+          f"{len(low_parity)} file(s) below 0.95")
+    for r in sorted(low_parity, key=lambda r: r["parity"]):
+        print(f"   ⚠️  {r['file']}: parity {r['parity']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Wrote {args.json}")
@@ -0,0 +1,242 @@
+# src/extractive.py
+"""
+Extractive fast tier: answer factual lookups straight from the top chunk.
+
+For questions like a fee amount, a library rule or a calendar date the
+best-matching chunk usually contains the answer verbatim. When
+
+  * the top hit is close enough (similarity >= EXTRACTIVE_MIN_SIM),
+  * it clearly beats the next distinct chunk (margin >= EXTRACTIVE_MIN_MARGIN),
+  * one or two of its sentences cover enough of the question's keywords
+    (>= EXTRACTIVE_MIN_SPAN) and add new information, and
+  * the question does not ask for an explanation or comparison,
+
+`answer_question` quotes that span with its source instead of calling the
+LLM, and reports "tier": "extractive". Everything else goes to the LLM.
+
+The tier is off by default (EXTRACTIVE_TIER=1 turns it on): the default
+thresholds have not yet been checked against the MiniLM encoder on the
+test questions. Run the report below on a deployment that has the
+encoder, tune the thresholds from it, then enable the tier.
+
+Similarities are derived from the backends' squared L2 distances, which
+for the unit-length MiniLM embeddings equals 2 - 2 * cosine.
+
+See how much LLM traffic the tier removes on a question set (no LLM calls):
+
+    python -m src.extractive
+    python -m src.extractive --min-sim 0.5 --min-margin 0.02 --min-span 0.7 --json tiers.json
+"""
+import os
+import re
+import json
+import argparse
+from collections import Counter
+
+EXTRACTIVE_TIER = os.getenv("EXTRACTIVE_TIER", "0") != "0"  # off until the thresholds are tuned (see below)
+MIN_SIM = float(os.getenv("EXTRACTIVE_MIN_SIM", "0.55"))        # cosine of question vs. top chunk
+MIN_MARGIN = float(os.getenv("EXTRACTIVE_MIN_MARGIN", "0.03"))  # top chunk vs. next distinct chunk
+MIN_SPAN = float(os.getenv("EXTRACTIVE_MIN_SPAN", "0.8"))       # share of question keywords in the span
+MIN_NEW_WORDS = 2          # span must say something the question does not
+MAX_SPAN_CHARS = 400       # longer spans read like a wall of text; let the LLM summarise
+
+# Questions that need reasoning or a summary rather than a quote
+SYNTHESIS_MARKERS = (
+    "why", "how do", "how does", "how can", "how should", "how to", "explain", "compare", "difference",
+    "summar", "should i", "what happens", "pros", "advantage", "steps", "process", "procedure", "all the",
+    # broad asks whose answer is a list of clauses, not one sentence
+    "rules", "regulations", "policy", "policies", "guidelines", "requirements", "criteria", "consequences",
+)
+# "Rs. 45,000" or "B. Tech" must not end a sentence
+ABBREVIATION_RE = re.compile(r"(?:\b(?:Rs|No|Nos|Dr|Mr|Mrs|Ms|Prof|Sl|St|vs|etc|approx|e\.g|i\.e)|\b[A-Z])\.$")
+NUMBER_RE = re.compile(r"^\d+(?:\.\d+)*\.?$")
+
+STOPWORDS = set("""
+a an the is are was were be been being am do does did doing have has had of in on at to for from by with
+about as into over under and or not no nor but if then than so that this these those there here it its
+i me my we our you your he she they them their what which who whom whose when where how why can could
+would should will shall may might must any some all each every tell give please know want need get
+college campus student students rgipt institute
+""".split())
+
+
+def keywords(text: str) -> set:
+    """Lowercased content words, with a light plural strip so "fees" matches "fee".
+
+    Hyphens and slashes split words ("end-semester" -> "end", "semester");
+    dotted abbreviations and numbers stay whole ("m.tech", "2.5", "45,000").
+    """
+    words = re.findall(r"[a-z0-9]+(?:\.[a-z0-9]+|(?<=\d),\d+)*", text.lower())
+    out = set()
+    for w in words:
+        if w in STOPWORDS or (len(w) < 2 and not w.isdigit()):
+            continue
+        out.add(w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w)
+    return out
+
+
+def sentences(text: str):
+    """Split a chunk into sentences, joining the PDF's hard line wraps first."""
+    flat = re.sub(r"\s*\n\s*", " ", text).strip()
+    out = []
+    for part in re.split(r"(?<=[.!?;])\s+(?=[A-Z0-9(₹])", flat):
+        if out and ABBREVIATION_RE.search(out[-1]):
+            out[-1] = f"{out[-1]} {part}"
+        elif part:
+            out.append(part)
+    return out
+
+
+def quotable(span: str) -> bool:
+    """Reject table-of-contents runs ("Code of Conduct 21 12.2 ..."), lead-ins ending in ":" and
+    fragments cut mid-sentence at a chunk boundary."""
+    tokens = span.split()
+    numbers = sum(1 for t in tokens if NUMBER_RE.match(t))
+    if span[0].islower() or span.rstrip().endswith(":"):
+        return False
+    return not (numbers >= 4 and numbers / len(tokens) > 0.25)
+
+
+def best_span(question_words: set, text: str):
+    """(coverage, span) of the sentence, or pair of adjacent sentences, covering most question keywords."""
+    sents = sentences(text)
+    candidates = sents + [f"{a} {b}" for a, b in zip(sents, sents[1:])]
+    best = (0.0, None)
+    for span in candidates:
+        if len(span) > MAX_SPAN_CHARS or not quotable(span):
+            continue
+        words = keywords(span)
+        if len(words - question_words) < MIN_NEW_WORDS:
+            continue
+        coverage = len(question_words & words) / len(question_words)
+        # Prefer higher coverage, then the shorter span
+        if coverage > best[0] or (coverage == best[0] and best[1] and len(span) < len(best[1])):
+            best = (coverage, span)
+    return best
+
+
+def needs_synthesis(question: str) -> bool:
+    q = f" {question.lower()} "
+    return any(f" {m}" in q for m in SYNTHESIS_MARKERS)
+
+
+def decide(question: str, scored, min_sim: float = MIN_SIM, min_margin: float = MIN_MARGIN,
+           min_span: float = MIN_SPAN) -> dict:
+    """Whether the top hit can answer `question` verbatim.
+
+    `scored` is [(Document, squared L2 distance)] closest first. Returns a
+    dict with "ok", the "reason" when not, and the measured sim/margin/
+    coverage; when ok also the "span" and the "doc" it came from.
+    """
+    out = {"ok": False, "reason": None, "sim": None, "margin": None, "coverage": None}
+    if not scored:
+        out["reason"] = "no_results"
+        return out
+
+    top_doc, top_dist = scored[0]
+    out["sim"] = round(1 - float(top_dist) / 2, 4)
+    # Duplicate chunks tie exactly; measure the margin against the next different text
+    runner_up = next((d for doc, d in scored[1:] if doc.page_content != top_doc.page_content), None)
+    out["margin"] = round(out["sim"] - (1 - float(runner_up) / 2), 4) if runner_up is not None else out["sim"]
+
+    q_words = keywords(question)
+    if needs_synthesis(question):
+        out["reason"] = "synthesis"
+    elif len(q_words) < 2:
+        out["reason"] = "vague_question"
+    elif out["sim"] < min_sim:
+        out["reason"] = "low_similarity"
+    elif out["margin"] < min_margin:
+        out["reason"] = "low_margin"
+    if out["reason"]:
+        return out
+
+    coverage, span = best_span(q_words, top_doc.page_content)
+    out["coverage"] = round(coverage, 4)
+    if span is None or coverage < min_span:
+        out["reason"] = "no_span"
+        return out
+    out.update(ok=True, span=span, doc=top_doc)
+    return out
+
+
+def extract_answer(question: str, scored):
+    """The `decide` result if the extractive tier can answer, else None."""
+    if not EXTRACTIVE_TIER:
+        return None
+    result = decide(question, scored)
+    return result if result["ok"] else None
+
+
+def render(result) -> str:
+    """Templated answer quoting the span (polish_answer adds the sources)."""
+    source = result["doc"].metadata.get("source", "the documents").replace(".pdf", "")
+    return f"Here’s what *{source}* says:\n\n> {result['span']}"
+
+
+# -------------------------
+# Tier report
+# -------------------------
+def tier_report(questions, min_sim=MIN_SIM, min_margin=MIN_MARGIN, min_span=MIN_SPAN):
+    """Which tier would answer each question, using retrieval only (no LLM calls)."""
+    from src import retriever
+
+    db, index_dir, _ = retriever.resolve_index()
+    store = retriever._live_answer_store(index_dir)
+    rows = []
+    for q in questions:
+        vector = db.embeddings.embed_query(q)
+        entry = store and (store.lookup_exact(q) or store.lookup_nearest(q, retriever.unit_vector(vector)))
+        result = decide(q, db.similarity_search_with_score_by_vector(vector, k=retriever.TOP_K),
+                        min_sim, min_margin, min_span)
+        tier = "precomputed" if entry else "extractive" if result["ok"] else "llm"
+        rows.append({
+            "question": q,
+            "tier": tier,
+            "reason": result["reason"],
+            "sim": result["sim"],
+            "margin": result["margin"],
+            "coverage": result["coverage"],
+            "source": result["doc"].metadata.get("source") if result["ok"] else None,
+            "span": result.get("span"),
+        })
+    return rows
+
+
+def print_report(rows):
+    for r in rows:
+        mark = {"extractive": "⚡", "precomputed": "📦"}.get(r["tier"], "🦙")
+        detail = f"sim {r['sim']} margin {r['margin']} span {r['coverage']}"
+        print(f"{mark} {r['question'][:70]:<70}  {r['tier']:<11} {r['reason'] or '':<15} {detail}")
+        if r["span"]:
+            print(f"      ↳ {r['span'][:140]}")
+
+    total = len(rows)
+    tiers = Counter(r["tier"] for r in rows)
+    reasons = Counter(r["reason"] for r in rows if r["tier"] == "llm")
+    print(f"\n📊 {total} questions: {dict(tiers)}")
+    if total:
+        print(f"   LLM calls removed by the extractive tier: {tiers['extractive']}/{total} "
+              f"({tiers['extractive'] / total:.0%}); with precomputed answers: "
+              f"{tiers['extractive'] + tiers['precomputed']}/{total} "
+              f"({(tiers['extractive'] + tiers['precomputed']) / total:.0%})")
+        print(f"   Sent to the LLM because: {dict(reasons)}")
+
+
+if __name__ == "__main__":
+    from src.answer_store import load_questions, DEFAULT_QUESTION_FILES
+
+    parser = argparse.ArgumentParser(description="Report how many questions the extractive tier answers without the LLM.")
+    parser.add_argument("--questions", nargs="*", default=DEFAULT_QUESTION_FILES)
+    parser.add_argument("--min-sim", type=float, default=MIN_SIM)
+    parser.add_argument("--min-margin", type=float, default=MIN_MARGIN)
+    parser.add_argument("--min-span", type=float, default=MIN_SPAN)
+    parser.add_argument("--json", help="also write per-question results to this file")
+    args = parser.parse_args()
+
+    rows = tier_report(load_questions(args.questions), args.min_sim, args.min_margin, args.min_span)
+    print_report(rows)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\n💾 Wrote {args.json}")
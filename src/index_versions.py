@@ -0,0 +1,147 @@
+# src/index_versions.py
+"""
+Versioned index directories with an atomic "current" pointer.
+
+Layout under FAISS_DIR:
+
+    faiss_index/
+    ├── CURRENT                 # name of the live version
+    └── versions/
+        ├── 20250101T120000/    # index.faiss, index.pkl, meta.pkl
+        └── 20250102T090000/
+
+A build writes into a hidden staging directory, which is renamed into
+`versions/` only once it is complete, and then CURRENT is replaced in one
+`os.replace`. Readers therefore never see a half-written index. A flat
+directory without CURRENT (the pre-versioning layout) is served as the
+"legacy" version.
+"""
+import os
+import time
+import shutil
+from pathlib import Path
+
+POINTER_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+STAGING_PREFIX = ".staging-"
+LEGACY_VERSION = "legacy"
+LEGACY_MARKERS = ("index.faiss", "chroma.sqlite3")
+KEEP_VERSIONS = int(os.getenv("INDEX_KEEP_VERSIONS", "3"))
+# A replaced version may still be served by a worker whose reload failed or lags; keep it at least this long
+KEEP_RETIRED_SECONDS = float(os.getenv("INDEX_KEEP_RETIRED_SECONDS", str(24 * 3600)))
+STALE_STAGING_SECONDS = 24 * 3600
+
+
+def current_version(root: str):
+    """Return the live version name, or None if no index has been built."""
+    root = Path(root)
+    pointer = root / POINTER_FILE
+    if pointer.exists():
+        version = pointer.read_text(encoding="utf-8").strip()
+        return version or None
+    if any((root / marker).exists() for marker in LEGACY_MARKERS):
+        return LEGACY_VERSION
+    return None
+
+
+def version_path(root: str, version: str) -> Path:
+    """Directory holding the files of a given version."""
+    if version == LEGACY_VERSION:
+        return Path(root)
+    return Path(root) / VERSIONS_DIR / version
+
+
+def current_path(root: str):
+    """Directory of the live version, or None if no index has been built."""
+    version = current_version(root)
+    return version_path(root, version) if version else None
+
+
+def list_versions(root: str):
+    """Published versions, oldest first."""
+    versions_dir = Path(root) / VERSIONS_DIR
+    if not versions_dir.exists():
+        return []
+    return sorted(p.name for p in versions_dir.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+
+def staging_dir(root: str) -> Path:
+    """Create an empty directory to build a new version into."""
+    versions_dir = Path(root) / VERSIONS_DIR
+    versions_dir.mkdir(parents=True, exist_ok=True)
+    version = time.strftime("%Y%m%dT%H%M%S")
+    n = 1
+    while (versions_dir / version).exists() or (versions_dir / f"{STAGING_PREFIX}{version}").exists():
+        n += 1
+        version = f"{time.strftime('%Y%m%dT%H%M%S')}-{n}"
+    path = versions_dir / f"{STAGING_PREFIX}{version}"
+    path.mkdir()
+    return path
+
+
+def _fsync_dir(path: Path):
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return  # not supported on this platform (e.g. Windows)
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def publish(root: str, staging: Path) -> str:
+    """Atomically make a finished staging directory the live version."""
+    root = Path(root)
+    staging = Path(staging)
+    version = staging.name[len(STAGING_PREFIX):]
+
+    # Flush the index files before anyone can see them
+    for f in staging.rglob("*"):
+        if f.is_file():
+            with open(f, "rb") as fh:
+                os.fsync(fh.fileno())
+
+    final = root / VERSIONS_DIR / version
+    os.rename(staging, final)
+    _fsync_dir(final.parent)
+
+    tmp_pointer = root / f".{POINTER_FILE}.tmp"
+    with open(tmp_pointer, "w", encoding="utf-8") as fh:
+        fh.write(version)
+        fh.flush()
+        os.fsync(fh.fileno())
+    os.replace(tmp_pointer, root / POINTER_FILE)
+    _fsync_dir(root)
+
+    prune(root)
+    return version
+
+
+def prune(root: str, keep: int = KEEP_VERSIONS, keep_retired_seconds: float = KEEP_RETIRED_SECONDS):
+    """Delete old versions and abandoned builds, never touching the live one.
+
+    Versions beyond the newest `keep` are deleted only once the build that
+    replaced them is older than `keep_retired_seconds`: a worker whose
+    reload failed or lags behind may still be serving them (for Chroma,
+    deleting the directory breaks its live queries).
+    """
+    live = current_version(root)
+    versions = list_versions(root)
+    old = [v for v in versions if v != live]
+    now = time.time()
+    for version in old[:max(len(old) - (keep - 1), 0)]:
+        successor = versions[versions.index(version) + 1]
+        try:
+            replaced_at = version_path(root, successor).stat().st_mtime
+        except OSError:
+            continue
+        if now - replaced_at < keep_retired_seconds:
+            continue  # may still be live in a worker that has not reloaded yet
+        shutil.rmtree(version_path(root, version), ignore_errors=True)
+
+    for staging in (Path(root) / VERSIONS_DIR).glob(f"{STAGING_PREFIX}*"):
+        if now - staging.stat().st_mtime > STALE_STAGING_SECONDS:
+            shutil.rmtree(staging, ignore_errors=True)
@@ -1,9 +1,11 @@
 # src/ingest.py
 import os
+import json
+import time
 from pathlib import Path
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
-from src.utils import read_pdf, read_docx, read_text, clean_text, list_data_files
+from src.utils import read_pdf, read_docx, read_text, clean_text, list_data_files, new_file_stats
 
 
 
@@ -11,16 +13,18 @@ from src.utils import read_pdf, read_docx, read_text, clean_text, list_data_file
 ROOT_DIR = Path(__file__).resolve().parents[1]
 DATA_DIR = ROOT_DIR / "data" / "raw"
 OUT_DIR = ROOT_DIR / "data" / "processed"
+PROFILE_PATH = Path(os.getenv("INGEST_PROFILE", ROOT_DIR / "data" / "ingest_profile.json"))
+TOP_OFFENDERS = 5
 
 # make sure output folder exists
 OUT_DIR.mkdir(parents=True, exist_ok=True)
 
 
-def file_to_text(path: str) -> str:
-    """Read a single file and return its text."""
+def file_to_text(path: str, stats: dict = None) -> str:
+    """Read a single file and return its text (PDF page stats go into `stats`)."""
     path = Path(path)
     if path.suffix.lower() == ".pdf":
-        return read_pdf(path)
+        return read_pdf(path, stats=stats)
     elif path.suffix.lower() == ".docx":
         return read_docx(path)
     elif path.suffix.lower() == ".txt":
@@ -36,11 +40,66 @@ def safe_filename(name: str) -> str:
     return safe[:150]  # keep below Windows 260-char path limit
 
 
-def ingest_all():
-    """Ingest every file from data/raw, chunk them, and save processed JSONs."""
-    files = list_data_files(str(DATA_DIR))
+def file_total_seconds(row: dict) -> float:
+    return row["read_seconds"] + row["chunk_seconds"] + (row.get("embed_seconds") or 0.0)
+
+
+def write_profile(rows, path: Path = PROFILE_PATH):
+    """Write the per-file profiling report as JSON, slowest files first."""
+    rows = sorted(rows, key=file_total_seconds, reverse=True)
+    totals = {
+        "files": len(rows),
+        "pages": sum(len(r["pages"]) for r in rows),
+        "text_layer_pages": sum(r["text_layer_pages"] for r in rows),
+        "ocr_pages": sum(r["ocr_pages"] for r in rows),
+        "trocr_pages": sum(r["trocr_pages"] for r in rows),
+        "easyocr_pages": sum(r["easyocr_pages"] for r in rows),
+        "chunks": sum(r["chunks"] for r in rows),
+        "seconds": round(sum(file_total_seconds(r) for r in rows), 3),
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"totals": totals, "files": rows}, fh, indent=2, ensure_ascii=False)
+    print(f"\n🧾 Ingest profile written to {path}")
+
+
+def print_profile_summary(rows, top: int = TOP_OFFENDERS):
+    """Print a per-file cost table and highlight the slowest documents."""
+    rows = sorted(rows, key=file_total_seconds, reverse=True)
+    total = sum(file_total_seconds(r) for r in rows) or 1.0
+    print("\n📊 Ingest profile (slowest first)")
+    print(f"{'':2} {'file':42} {'pages':>5} {'text':>5} {'ocr':>4} {'trocr':>5} {'easy':>4} "
+          f"{'chars':>8} {'chunks':>6} {'read s':>7} {'embed s':>7} {'share':>6}")
+    for n, r in enumerate(rows):
+        name = r["file"] if len(r["file"]) <= 42 else r["file"][:41] + "…"
+        embed = f"{r['embed_seconds']:.2f}" if r.get("embed_seconds") is not None else "-"
+        mark = "🔥" if n < top else "  "
+        print(f"{mark} {name:42} {len(r['pages']):>5} {r['text_layer_pages']:>5} {r['ocr_pages']:>4} "
+              f"{r['trocr_pages']:>5} {r['easyocr_pages']:>4} {r['chars']:>8} {r['chunks']:>6} "
+              f"{r['read_seconds']:>7.2f} {embed:>7} {file_total_seconds(r) / total:>6.1%}")
+
+    offenders = rows[:top]
+    if offenders:
+        share = sum(file_total_seconds(r) for r in offenders) / total
+        print(f"\n🔥 Top {len(offenders)} files take {share:.0%} of ingest time:")
+        for r in offenders:
+            slowest = max(r["seconds"].items(), key=lambda kv: kv[1], default=("read", r["read_seconds"]))
+            print(f"   • {r['file']}: {file_total_seconds(r):.2f}s (mostly {slowest[0]}: {slowest[1]:.2f}s)")
+
+
+def ingest_all(profile: list = None, report: bool = True, data_dir: Path = DATA_DIR, out_dir: Path = OUT_DIR):
+    """
+    Ingest every file from data/raw (or `data_dir`), chunk them, and save processed JSONs.
+
+    Per-file profiling rows are appended to `profile` if given. With
+    `report=True` the profile is also written to INGEST_PROFILE and
+    summarised on stdout; `build_vectorstore` turns this off so it can add
+    embedding times first.
+    """
+    profile = [] if profile is None else profile
+    files = list_data_files(str(data_dir))
     if not files:
-        raise FileNotFoundError(f"❌ No documents found in {DATA_DIR}")
+        raise FileNotFoundError(f"❌ No documents found in {data_dir}")
 
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=800,
@@ -51,20 +110,38 @@ def ingest_all():
     processed_docs = []
 
     for f in files:
-        text = clean_text(file_to_text(f))
-        if not text.strip():
-            print(f"⚠️ Skipping empty file: {f}")
-            continue
+        stats = new_file_stats()
+        start = time.perf_counter()
+        text = clean_text(file_to_text(f, stats))
+        read_seconds = time.perf_counter() - start
 
-        chunks = splitter.split_text(text)
+        start = time.perf_counter()
+        chunks = splitter.split_text(text) if text.strip() else []
         docs = [
             Document(page_content=chunk, metadata={"source": Path(f).name, "chunk": i})
             for i, chunk in enumerate(chunks)
         ]
+        chunk_seconds = time.perf_counter() - start
+
+        profile.append({
+            "file": Path(f).name,
+            "type": Path(f).suffix.lower().lstrip("."),
+            **stats,
+            "seconds": {k: round(v, 4) for k, v in stats["seconds"].items()},
+            "chars": len(text),
+            "chunks": len(docs),
+            "read_seconds": round(read_seconds, 4),
+            "chunk_seconds": round(chunk_seconds, 4),
+            "embed_seconds": None,
+        })
+
+        if not docs:
+            print(f"⚠️ Skipping empty file: {f}")
+            continue
 
         # build safe path and ensure directory exists
         safe_name = safe_filename(Path(f).stem)
-        out_path = OUT_DIR / f"{safe_name}.json"
+        out_path = Path(out_dir) / f"{safe_name}.json"
         out_path.parent.mkdir(parents=True, exist_ok=True)
 
         # write the preview JSON for inspection
@@ -82,6 +159,9 @@ def ingest_all():
         print(f"   → saved preview to {out_path}")
 
     print(f"\n📚 Total processed chunks: {len(processed_docs)}")
+    if report:
+        write_profile(profile)
+        print_profile_summary(profile)
     return processed_docs
 
 
@@ -0,0 +1,195 @@
+# src/llm_cache.py
+"""
+Disk-backed cache of LLM responses, shared by every worker on the host.
+
+Responses live in one SQLite file in WAL mode, so uvicorn workers (separate
+processes) read concurrently and writes serialize on SQLite's own lock.
+The key is a SHA-256 of the endpoint, the index version and the full
+chat payload (model, generation parameters and every message, including
+the filled prompt), so an identical request skips the router even after
+a restart, and answers from another endpoint (e.g. the load-test mock)
+are never served in its place.
+
+Entries are labelled with the index they were built from ("<version>"
+for the default index, "<tenant>/<version>" for a tenant's); entries
+from older versions of an index are dropped when a new version goes
+live. The least recently used entries are evicted once the file holds
+more than LLM_CACHE_MAX_MB of responses. Set LLM_CACHE_MAX_MB=0
+to disable the cache. Any SQLite error is treated as a miss; the cache
+never fails a request.
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "data/llm_cache.sqlite3")
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "64"))
+EVICT_TO = 0.9  # after eviction the cache holds at most this share of the budget
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    index_version TEXT NOT NULL,
+    response TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used);
+CREATE INDEX IF NOT EXISTS responses_version ON responses (index_version);
+"""
+
+
+def version_label(version: str, tenant_id: str = None) -> str:
+    """Cache label of an index version; tenant IDs never contain "/"."""
+    version = version or ""
+    return f"{tenant_id}/{version}" if tenant_id else version
+
+
+def cache_key(payload: dict, index_version: str, endpoint: str) -> str:
+    """Hash of the endpoint, the index version and the exact request body sent to it."""
+    body = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(f"{endpoint}\n{index_version}\n{body}".encode()).hexdigest()
+
+
+class ResponseCache:
+    """SQLite response cache with LRU eviction by total response size."""
+
+    def __init__(self, path=LLM_CACHE_PATH, max_mb: float = LLM_CACHE_MAX_MB):
+        self.path = Path(path)
+        self.max_bytes = int(max_mb * 2**20)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _conn(self):
+        """One connection per thread and process (connections must not cross a fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _count(self, name: str, n: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def get(self, key: str):
+        """Cached response text, or None."""
+        if not self.enabled:
+            return None
+        try:
+            conn = self._conn()
+            row = conn.execute("SELECT response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+        except sqlite3.Error as e:
+            self._count("errors")
+            print(f"⚠️ LLM cache read failed: {e}")
+            return None
+        self._count("hits" if row is not None else "misses")
+        return row[0] if row is not None else None
+
+    def put(self, key: str, response: str, index_version: str):
+        if not self.enabled:
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, index_version, response, size, created, last_used) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, index_version, response, len(response.encode()), now, now),
+                )
+                evicted = self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            self._count("errors")
+            print(f"⚠️ LLM cache write failed: {e}")
+            return
+        self._count("stores")
+        self._count("evicted", evicted)
+
+    def _evict(self, conn) -> int:
+        """Drop least recently used rows once the total size exceeds the budget."""
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        to_free = total - int(self.max_bytes * EVICT_TO)
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY last_used"):
+            victims.append((key,))
+            to_free -= size
+            if to_free <= 0:
+                break
+        conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        return len(victims)
+
+    def invalidate(self, keep_label: str) -> int:
+        """Delete entries from other versions of the same index (default or one tenant) as `keep_label`."""
+        if not self.enabled:
+            return 0
+        prefix = keep_label.rpartition("/")[0]
+        try:
+            if prefix:
+                n = self._conn().execute(
+                    "DELETE FROM responses WHERE substr(index_version, 1, ?) = ? AND index_version != ?",
+                    (len(prefix) + 1, prefix + "/", keep_label),
+                ).rowcount
+            else:
+                n = self._conn().execute(
+                    "DELETE FROM responses WHERE instr(index_version, '/') = 0 AND index_version != ?",
+                    (keep_label,),
+                ).rowcount
+        except sqlite3.Error as e:
+            self._count("errors")
+            print(f"⚠️ LLM cache invalidation failed: {e}")
+            return 0
+        if n:
+            print(f"🧹 Dropped {n} cached LLM responses from older index versions")
+        return n
+
+    def stats(self):
+        with self._lock:
+            out = {
+                "enabled": self.enabled,
+                "path": str(self.path),
+                "max_mb": round(self.max_bytes / 2**20, 1),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stores": self.stores,
+                "evicted": self.evicted,
+                "errors": self.errors,
+            }
+        if self.enabled:
+            try:
+                entries, size = self._conn().execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+                out.update(entries=entries, size_mb=round(size / 2**20, 3))
+            except sqlite3.Error:
+                pass
+        return out
+
+
+llm_cache = ResponseCache()
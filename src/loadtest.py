@@ -0,0 +1,315 @@
+# src/loadtest.py
+"""
+HTTP load test for the FastAPI service.
+
+Drives POST /api/answer with questions from TEST_QUESTIONS.md, either as a
+closed loop (N concurrent users, each sending the next request when the
+previous one returns) or an open loop (Poisson arrivals at a fixed rate,
+latency measured from the scheduled send time so queueing is not hidden).
+Reports throughput, p50/p95/p99 latency, error rates by status and which
+answer tier served each request.
+
+With --spawn it starts the local LLM mock (src/mock_llm.py) and the app
+(uvicorn) pointed at it, so the whole run is offline. The spawned app gets
+its own throwaway LLM cache, disabled unless --llm-cache is given, so mock
+answers never reach the real cache and repeated questions still hit the
+mock. The report includes cache hits (from /api/admin/metrics) and, with
+--spawn, how many calls reached the mock:
+
+    python -m src.loadtest --spawn --concurrency 16 --duration 30
+    python -m src.loadtest --spawn --rate 20 --duration 60 --mock-latency-ms 1500 --mock-error-rate 0.02
+    python -m src.loadtest --url http://localhost:8000 --concurrency 8 --sessions --json load.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import tempfile
+import uuid
+import random
+import argparse
+import threading
+import subprocess
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import requests  # pyright: ignore[reportMissingModuleSource]
+
+from src.answer_store import load_questions, DEFAULT_QUESTION_FILES
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+# Answers the server returns with a 200 when the LLM call or retrieval failed
+FAILED_ANSWER_PREFIXES = ("❌", "Sorry, something went wrong")
+
+
+class Result:
+    __slots__ = ("latency", "status", "tier", "answer_error", "retry_after")
+
+    def __init__(self, latency, status, tier=None, answer_error=False, retry_after=None):
+        self.latency = latency
+        self.status = status            # HTTP status, 0 for connection errors/timeouts
+        self.tier = tier
+        self.answer_error = answer_error  # 200 but the answer is an error message
+        self.retry_after = retry_after
+
+    @property
+    def ok(self):
+        return self.status == 200 and not self.answer_error
+
+
+def send(http, url: str, question: str, session_id: str, timeout: float, started: float = None) -> Result:
+    """POST one question; latency counts from `started` (scheduled time) if given."""
+    started = started or time.perf_counter()
+    body = {"question": question}
+    if session_id:
+        body["session_id"] = session_id
+    try:
+        r = http.post(f"{url}/api/answer", json=body, timeout=timeout)
+        latency = time.perf_counter() - started
+        if r.status_code != 200:
+            return Result(latency, r.status_code, retry_after=r.headers.get("Retry-After"))
+        data = r.json()
+        return Result(latency, 200, data.get("tier", r.headers.get("X-Answer-Tier")),
+                      data.get("answer", "").startswith(FAILED_ANSWER_PREFIXES))
+    except requests.RequestException:
+        return Result(time.perf_counter() - started, 0)
+
+
+def run_closed(url, questions, concurrency, duration, max_requests, sessions, timeout):
+    """N users in a loop: each sends its next question as soon as the last one returns."""
+    results, lock = [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    sent = iter(range(max_requests)) if max_requests else None
+
+    def user(n):
+        rng = random.Random(n)
+        http = requests.Session()
+        session_id = str(uuid.uuid4()) if sessions else None
+        while time.perf_counter() < deadline:
+            if sent is not None:
+                with lock:
+                    if next(sent, None) is None:
+                        return
+            res = send(http, url, rng.choice(questions), session_id, timeout)
+            with lock:
+                results.append(res)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def run_open(url, questions, rate, duration, max_requests, sessions, timeout, max_in_flight):
+    """Poisson arrivals at `rate` req/s, independent of how fast the server answers."""
+    rng = random.Random(0)
+    local = threading.local()
+    session_ids = [str(uuid.uuid4()) for _ in range(32)] if sessions else [None]
+
+    def task(question, session_id, scheduled):
+        if not hasattr(local, "http"):
+            local.http = requests.Session()
+        return send(local.http, url, question, session_id, timeout, started=scheduled)
+
+    futures = []
+    start = time.perf_counter()
+    next_at = start
+    with ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        while next_at - start < duration and (not max_requests or len(futures) < max_requests):
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(task, rng.choice(questions), rng.choice(session_ids), next_at))
+            next_at += rng.expovariate(rate)
+    return [f.result() for f in futures]
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = (len(values) - 1) * p / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def fetch_cache_stats(url: str):
+    """LLM cache counters of the server (one worker's view), or None if unavailable."""
+    headers = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]} if os.getenv("ADMIN_TOKEN") else {}
+    try:
+        r = requests.get(f"{url}/api/admin/metrics", headers=headers, timeout=5)
+        return r.json().get("llm_cache") if r.status_code == 200 else None
+    except (requests.RequestException, ValueError):
+        return None
+
+
+def cache_delta(before, after):
+    if not before or not after:
+        return None
+    return {"enabled": after.get("enabled"),
+            **{k: after.get(k, 0) - before.get(k, 0) for k in ("hits", "misses", "stores")}}
+
+
+def summarize(results, elapsed):
+    ok = [r.latency for r in results if r.ok]
+    total = len(results)
+    statuses = Counter("timeout/conn" if r.status == 0 else str(r.status) for r in results)
+    return {
+        "requests": total,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "offered_rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "ok": len(ok),
+        "error_rate": round(1 - len(ok) / total, 4) if total else 0.0,
+        "answer_errors": sum(1 for r in results if r.answer_error),
+        "status_counts": dict(statuses),
+        "tiers": dict(Counter(r.tier for r in results if r.status == 200)),
+        "latency_ms": {
+            "p50": round(percentile(ok, 50) * 1000, 1),
+            "p95": round(percentile(ok, 95) * 1000, 1),
+            "p99": round(percentile(ok, 99) * 1000, 1),
+            "max": round(max(ok) * 1000, 1) if ok else 0.0,
+        },
+        "rejected_latency_ms_p50": round(percentile([r.latency for r in results if r.status == 503], 50) * 1000, 1),
+    }
+
+
+def print_report(summary):
+    lat = summary["latency_ms"]
+    print("\n📊 Load test results")
+    print(f"   Requests:    {summary['requests']} in {summary['elapsed_s']}s "
+          f"(offered {summary['offered_rps']} req/s)")
+    print(f"   Throughput:  {summary['throughput_rps']} successful req/s")
+    print(f"   Latency:     p50 {lat['p50']} ms | p95 {lat['p95']} ms | p99 {lat['p99']} ms | max {lat['max']} ms")
+    print(f"   Error rate:  {summary['error_rate']:.2%} "
+          f"(failed answers inside 200s: {summary['answer_errors']})")
+    print(f"   Statuses:    {summary['status_counts']}")
+    print(f"   Tiers:       {summary['tiers']}")
+    cache = summary.get("llm_cache")
+    if cache is None:
+        print("   LLM cache:   unknown (metrics endpoint unavailable)")
+    elif not cache["enabled"]:
+        print("   LLM cache:   disabled")
+    else:
+        print(f"   LLM cache:   {cache['hits']} hits, {cache['misses']} misses (one worker's counters)")
+    if summary.get("mock_llm_calls") is not None:
+        print(f"   Mock LLM:    {summary['mock_llm_calls']} calls reached the mock")
+    if "503" in summary["status_counts"]:
+        print(f"   503s were shed in p50 {summary['rejected_latency_ms_p50']} ms")
+
+
+def wait_for(url: str, timeout: float = 60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(url, timeout=2).status_code < 500:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def spawn_stack(args):
+    """Start the LLM mock in-process and the app as a uvicorn subprocess pointed at it."""
+    from src.mock_llm import MockConfig, start_mock_server
+
+    mock = start_mock_server(args.mock_port, MockConfig(args.mock_latency_ms, args.mock_jitter,
+                                                        args.mock_error_rate, args.mock_rate_limit_rate, seed=0))
+    # Never share the real cache: mock answers must not be served to students later
+    cache_dir = tempfile.mkdtemp(prefix="loadtest-cache-")
+    env = dict(os.environ,
+               HF_CHAT_URL=f"http://127.0.0.1:{args.mock_port}/v1/chat/completions",
+               HF_TOKEN=os.getenv("HF_TOKEN") or "mock-token",
+               LLM_CACHE_PATH=os.path.join(cache_dir, "llm_cache.sqlite3"))
+    if not args.llm_cache:
+        env["LLM_CACHE_MAX_MB"] = "0"
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--host", "127.0.0.1", "--port", str(args.app_port),
+         "--workers", str(args.workers), "--log-level", "warning"],
+        cwd=ROOT_DIR, env=env,
+    )
+    url = f"http://127.0.0.1:{args.app_port}"
+    if not wait_for(url + "/"):
+        app.terminate()
+        mock.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+        raise SystemExit("❌ App did not start within 60s")
+    print(f"🚀 App on {url}, mock LLM on :{args.mock_port} (median {args.mock_latency_ms:.0f} ms, "
+          f"500s {args.mock_error_rate:.0%}, 429s {args.mock_rate_limit_rate:.0%}, "
+          f"LLM cache {'on (temporary)' if args.llm_cache else 'off'})")
+    return url, app, mock, cache_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test /api/answer.")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="base URL of a running server")
+    parser.add_argument("--questions", nargs="*", default=DEFAULT_QUESTION_FILES)
+    parser.add_argument("--concurrency", type=int, default=8, help="closed loop: concurrent users")
+    parser.add_argument("--rate", type=float, help="open loop: arrivals per second (overrides --concurrency)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="open loop: client-side request cap")
+    parser.add_argument("--duration", type=float, default=30, help="seconds to generate load")
+    parser.add_argument("--requests", type=int, default=0, help="stop after this many requests (0 = no cap)")
+    parser.add_argument("--sessions", action="store_true", help="send session IDs (one per user)")
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--warmup", type=int, default=1, help="requests sent (and ignored) before measuring")
+    parser.add_argument("--json", help="also write the summary to this file")
+    spawn = parser.add_argument_group("offline stack (--spawn)")
+    spawn.add_argument("--spawn", action="store_true", help="start the mock LLM and the app locally")
+    spawn.add_argument("--app-port", type=int, default=8010)
+    spawn.add_argument("--workers", type=int, default=1)
+    spawn.add_argument("--mock-port", type=int, default=8099)
+    spawn.add_argument("--mock-latency-ms", type=float, default=800)
+    spawn.add_argument("--mock-jitter", type=float, default=0.4)
+    spawn.add_argument("--mock-error-rate", type=float, default=0.0)
+    spawn.add_argument("--mock-rate-limit-rate", type=float, default=0.0)
+    spawn.add_argument("--llm-cache", action="store_true",
+                       help="keep the LLM response cache on (in a temporary file) to measure its effect")
+    args = parser.parse_args()
+
+    questions = load_questions(args.questions)
+    if not questions:
+        raise SystemExit("❌ No questions found")
+
+    app_proc = mock = cache_dir = None
+    url = args.url.rstrip("/")
+    if args.spawn:
+        url, app_proc, mock, cache_dir = spawn_stack(args)
+    try:
+        # The first request loads the index and encoder; keep it out of the numbers
+        warm = requests.Session()
+        for q in questions[:args.warmup]:
+            send(warm, url, q, None, args.timeout)
+
+        mode = f"open loop at {args.rate} req/s" if args.rate else f"closed loop with {args.concurrency} users"
+        print(f"🔥 Load testing {url}/api/answer: {mode} for {args.duration:.0f}s, {len(questions)} questions")
+        cache_before = fetch_cache_stats(url)
+        mock_before = mock.config.calls if mock is not None else None
+        start = time.perf_counter()
+        if args.rate:
+            results = run_open(url, questions, args.rate, args.duration, args.requests, args.sessions,
+                               args.timeout, args.max_in_flight)
+        else:
+            results = run_closed(url, questions, args.concurrency, args.duration, args.requests, args.sessions,
+                                 args.timeout)
+        summary = summarize(results, time.perf_counter() - start)
+        summary["llm_cache"] = cache_delta(cache_before, fetch_cache_stats(url))
+        summary["mock_llm_calls"] = mock.config.calls - mock_before if mock is not None else None
+        summary["config"] = {k: v for k, v in vars(args).items() if k != "questions"}
+        print_report(summary)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(summary, f, indent=2)
+            print(f"\n💾 Wrote {args.json}")
+    finally:
+        if app_proc is not None:
+            app_proc.terminate()
+            app_proc.wait(timeout=10)
+        if mock is not None:
+            mock.shutdown()
+        if cache_dir is not None:
+            shutil.rmtree(cache_dir, ignore_errors=True)
@@ -0,0 +1,108 @@
+# src/mock_llm.py
+"""
+Local stand-in for the Hugging Face chat-completions router.
+
+Answers POST /v1/chat/completions in the same JSON shape as the router, after
+a configurable latency, and fails a configurable share of calls with 500s or
+429s. Point the server at it with HF_CHAT_URL to load-test without network
+access or token spend:
+
+    python -m src.mock_llm --port 8099 --latency-ms 800 --jitter 0.4 --error-rate 0.02 --rate-limit-rate 0.01
+    HF_CHAT_URL=http://127.0.0.1:8099/v1/chat/completions HF_TOKEN=mock \
+        LLM_CACHE_PATH=/tmp/mock_cache.sqlite3 python app.py
+"""
+import json
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockConfig:
+    def __init__(self, latency_ms: float = 800, jitter: float = 0.4, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, seed: int = None):
+        self.latency_ms = latency_ms      # median latency
+        self.jitter = jitter              # lognormal sigma; 0 = fixed latency
+        self.error_rate = error_rate      # share of calls answered with 500
+        self.rate_limit_rate = rate_limit_rate  # share of calls answered with 429
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = 0
+
+    def sample(self):
+        """Return (delay seconds, status) for one call."""
+        with self.lock:
+            self.calls += 1
+            delay = self.latency_ms / 1000 * (self.rng.lognormvariate(0, self.jitter) if self.jitter else 1)
+            roll = self.rng.random()
+        if roll < self.rate_limit_rate:
+            return 0.01, 429  # real rate limits come back fast
+        if roll < self.rate_limit_rate + self.error_rate:
+            return delay, 500
+        return delay, 200
+
+
+def make_handler(config: MockConfig):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            delay, status = config.sample()
+            time.sleep(delay)
+
+            if status == 200:
+                question = body.get("messages", [{}])[-1].get("content", "").rsplit("Question:", 1)[-1]
+                question = question.split("\n", 1)[0].strip()
+                payload = {
+                    "id": f"mock-{config.calls}",
+                    "object": "chat.completion",
+                    "model": body.get("model", "mock"),
+                    "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                        "role": "assistant",
+                        "content": f"(mock answer) Here is what the documents say about: {question}",
+                    }}],
+                }
+            else:
+                payload = {"error": "rate limited" if status == 429 else "mock upstream error"}
+
+            data = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if status == 429:
+                self.send_header("Retry-After", "1")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass  # keep load-test output readable
+
+    return Handler
+
+
+def start_mock_server(port: int = 8099, config: MockConfig = None, host: str = "127.0.0.1"):
+    """Run the mock in a background thread; returns the server (call .shutdown() to stop)."""
+    config = config or MockConfig()
+    server = ThreadingHTTPServer((host, port), make_handler(config))
+    server.daemon_threads = True
+    server.config = config  # load tests read .config.calls
+    threading.Thread(target=server.serve_forever, daemon=True, name="mock-llm").start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mock Hugging Face chat-completions endpoint.")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency-ms", type=float, default=800, help="median response latency")
+    parser.add_argument("--jitter", type=float, default=0.4, help="lognormal sigma of the latency (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls that return 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls that return 429")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.jitter, args.error_rate, args.rate_limit_rate, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(config))
+    server.daemon_threads = True
+    print(f"🧪 Mock LLM on http://127.0.0.1:{args.port}/v1/chat/completions "
+          f"(median {args.latency_ms:.0f} ms, 500s {args.error_rate:.0%}, 429s {args.rate_limit_rate:.0%})")
+    server.serve_forever()
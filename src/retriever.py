@@ -1,10 +1,17 @@
 # src/retriever.py  ✨ conversational upgrade version
 
 import os
+import time
+import threading
+from functools import lru_cache
+import numpy as np  # pyright: ignore[reportMissingImports]
 import requests  # pyright: ignore[reportMissingModuleSource]
 from dotenv import load_dotenv  # pyright: ignore[reportMissingImports]
-from langchain_community.vectorstores import FAISS  # pyright: ignore[reportMissingImports]
-from langchain_community.embeddings import HuggingFaceEmbeddings  # pyright: ignore[reportMissingImports]
+from src.sessions import sessions
+from src import index_versions, answer_store, backends, extractive
+from src.admission import llm_admission, Overloaded
+from src.llm_cache import llm_cache, cache_key, version_label
+from src.tenants import TenantManager, UnknownTenant
 
 load_dotenv()
 
@@ -13,24 +20,146 @@ HF_TOKEN = os.getenv("HF_TOKEN")
 MODEL = os.getenv("LLM_MODEL", "meta-llama/Meta-Llama-3-8B-Instruct:novita")
 PERSIST_DIR = os.getenv("FAISS_DIR", "faiss_index")
 EMBED_MODEL = os.getenv("EMBED_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+TOP_K = 5
+SESSION_BLEND = float(os.getenv("SESSION_BLEND", "0.7"))          # weight of the new question vs. previous turn
+SESSION_REUSE_SIM = float(os.getenv("SESSION_REUSE_SIM", "0.9"))  # follow-ups this close reuse the last chunks
+INDEX_POLL_SECONDS = float(os.getenv("INDEX_POLL_SECONDS", "5"))  # how often the server checks for a new index
 
 # === Global cache ===
-_db = None
-_emb_model = None
+_live = None           # (db, version, loaded_at) of the default index, replaced in one assignment
+_encoders = {}          # model name -> encoder, shared by the default index and every tenant
+_encoder_lock = threading.Lock()
+_load_lock = threading.Lock()
+_watcher = None
 
 # -------------------------
 # Vectorstore Loader
 # -------------------------
+def _encoder(model_name: str):
+    """One encoder instance per model, shared across index versions and tenants."""
+    with _encoder_lock:
+        if model_name not in _encoders:
+            # Heavy imports (langchain, torch, transformers) happen on first load, not at server startup
+            from langchain_community.embeddings import HuggingFaceEmbeddings  # pyright: ignore[reportMissingImports]
+
+            _encoders[model_name] = HuggingFaceEmbeddings(model_name=model_name)
+        return _encoders[model_name]
+
+
+@lru_cache(maxsize=256)
+def embed_model_of(path) -> str:
+    """Encoder an index version was built with (published versions never change)."""
+    return backends.read_meta(path).get("embed_model", EMBED_MODEL)
+
+
+def load_index_dir(path):
+    """Load one index version directory with the shared encoder for the model it was built with."""
+    return backends.load_index(path, _encoder(embed_model_of(path)))
+
+
+def _load_version(version: str):
+    """Load one version of the default index from disk (does not touch the live index)."""
+    return load_index_dir(index_versions.version_path(PERSIST_DIR, version))
+
+
+def _swap_in(version: str):
+    """Load a version and make it live. In-flight requests keep the index they already hold."""
+    global _live
+    db = _load_version(version)
+    _live = (db, version, time.time())
+    print(f"✅ Loaded {db.name} index version {version} from {PERSIST_DIR}")
+    llm_cache.invalidate(version_label(version))
+
+
+def _live_snapshot():
+    """(db, version, loaded_at) of the live default index, loading it on first use.
+
+    Read the tuple once per request; separate reads of the db and its
+    version could straddle a hot swap.
+    """
+    if _live is None:
+        with _load_lock:
+            if _live is None:
+                version = index_versions.current_version(PERSIST_DIR)
+                if version is None:
+                    raise FileNotFoundError(f"FAISS index directory not found: {PERSIST_DIR}")
+                _swap_in(version)
+    return _live
+
+
 def get_vectorstore():
-    """Load FAISS index lazily and reuse between calls."""
-    global _db, _emb_model
-    if _db is None:
-        if not os.path.exists(PERSIST_DIR):
-            raise FileNotFoundError(f"FAISS index directory not found: {PERSIST_DIR}")
-        _emb_model = HuggingFaceEmbeddings(model_name=EMBED_MODEL)
-        _db = FAISS.load_local(PERSIST_DIR, embeddings=_emb_model, allow_dangerous_deserialization=True)
-        print(f"✅ Loaded FAISS index from {PERSIST_DIR}")
-    return _db
+    """Load the live index (FAISS or Chroma, per meta.pkl) lazily and reuse between calls."""
+    return _live_snapshot()[0]
+
+
+def reload_if_changed() -> bool:
+    """Swap in the index named by the CURRENT pointer if it differs from the live one."""
+    version = index_versions.current_version(PERSIST_DIR)
+    if version is None or (_live and version == _live[1]):
+        return False
+    with _load_lock:
+        if _live and version == _live[1]:
+            return False
+        _swap_in(version)
+    return True
+
+
+def live_index_dir():
+    """Directory of the index version currently being served."""
+    return index_versions.version_path(PERSIST_DIR, _live_snapshot()[1])
+
+
+def index_status():
+    """Live and on-disk index versions, for the admin endpoint."""
+    db, version, loaded_at = _live or (None, None, None)
+    return {
+        "live_version": version,
+        "loaded_at": loaded_at,
+        "embed_model": embed_model_of(index_versions.version_path(PERSIST_DIR, version)) if version else None,
+        "backend": db.name if db is not None else None,
+        "current_pointer": index_versions.current_version(PERSIST_DIR),
+        "available_versions": index_versions.list_versions(PERSIST_DIR),
+        "index_dir": PERSIST_DIR,
+    }
+
+
+def _watch_index(interval: float):
+    failed = None
+    while True:
+        time.sleep(interval)
+        pointer = None
+        try:
+            pointer = index_versions.current_version(PERSIST_DIR)
+            if _live is not None and pointer != failed:
+                reload_if_changed()
+        except Exception as e:
+            # Keep serving the old index; retry only once the pointer moves again
+            failed = pointer
+            print(f"❌ Failed to load index version {pointer}: {e}")
+        tenant_indexes.reload_changed()
+
+
+def start_index_watcher(interval: float = INDEX_POLL_SECONDS):
+    """Poll the CURRENT pointers (default index and loaded tenants) and hot-swap new builds."""
+    global _watcher
+    if _watcher is None and interval > 0:
+        _watcher = threading.Thread(target=_watch_index, args=(interval,), daemon=True, name="index-watcher")
+        _watcher.start()
+    return _watcher
+
+# -------------------------
+# Tenants
+# -------------------------
+tenant_indexes = TenantManager(load_index_dir)
+
+
+def resolve_index(tenant_id: str = None):
+    """(db, index_dir, cache label) of the index serving a request: the tenant's, or the default one."""
+    if tenant_id:
+        index = tenant_indexes.get(tenant_id)
+        return index.db, index.path, version_label(index.version, tenant_id)
+    db, version, _ = _live_snapshot()
+    return db, index_versions.version_path(PERSIST_DIR, version), version_label(version)
 
 # -------------------------
 # Smart Conversational Prompt
@@ -54,10 +183,18 @@ Now craft your answer naturally, ending with a short helpful note if relevant.
 # -------------------------
 # Hugging Face Llama Inference
 # -------------------------
-HF_CHAT_URL = "https://router.huggingface.co/v1/chat/completions"
+HF_CHAT_URL = os.getenv("HF_CHAT_URL", "https://router.huggingface.co/v1/chat/completions")  # point at src/mock_llm.py for load tests
+
+def hf_llama_inference(prompt: str, history=None, index_version: str = None) -> str:
+    """Call Llama-3 8B via Hugging Face Router.
 
-def hf_llama_inference(prompt: str) -> str:
-    """Call Llama-3 8B via Hugging Face Router."""
+    `history` is an optional list of earlier chat messages (session turns),
+    sent between the system message and the new prompt. Raises `Overloaded`
+    when no LLM slot frees up in time or the router rate-limits us.
+    Identical requests against the same index version are answered from
+    the on-disk response cache (see `src/llm_cache.py`); `index_version` is
+    the cache label of the index the prompt came from (default: the live one).
+    """
     if not HF_TOKEN:
         return "❌ Missing HF_TOKEN in .env. Get one from https://huggingface.co/settings/tokens"
 
@@ -66,6 +203,7 @@ def hf_llama_inference(prompt: str) -> str:
         "model": MODEL,
         "messages": [
             {"role": "system", "content": "You are Campus Compass, a friendly AI assistant for college students."},
+            *(history or []),
             {"role": "user", "content": prompt}
         ],
         "stream": False,
@@ -73,14 +211,31 @@ def hf_llama_inference(prompt: str) -> str:
         "temperature": 0.3,
     }
 
+    version = index_version or version_label(_live[1] if _live else None)
+    key = cache_key(payload, version, HF_CHAT_URL)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+
     try:
-        r = requests.post(HF_CHAT_URL, headers=headers, json=payload, timeout=40)
+        with llm_admission.slot():
+            r = requests.post(HF_CHAT_URL, headers=headers, json=payload, timeout=40)
+        if r.status_code == 429:
+            llm_admission.record_rate_limited()
+            retry_after = r.headers.get("Retry-After", "")
+            raise Overloaded("LLM router rate limit reached",
+                             int(retry_after) if retry_after.isdigit() else llm_admission.retry_after())
         r.raise_for_status()
         data = r.json()
-        return data["choices"][0]["message"]["content"].strip()
+        answer = data["choices"][0]["message"]["content"].strip()
+    except Overloaded:
+        raise
     except Exception as e:
         return f"❌ Llama inference failed: {e}"
 
+    llm_cache.put(key, answer, version)
+    return answer
+
 # -------------------------
 # Post-Processing for Natural Tone + Sources
 # -------------------------
@@ -101,37 +256,202 @@ def polish_answer(answer: str, sources):
 
     return answer
 
+# -------------------------
+# Precomputed Answers
+# -------------------------
+def _live_answer_store(index_dir):
+    """answers.pkl published with an index version, if it was built with the same encoder."""
+    store = answer_store.load_for_index(index_dir)
+    if store is None or store.embed_model not in (None, embed_model_of(index_dir)):
+        return None
+    return store
+
+
+def _precomputed_response(entry):
+    sources = format_sources(entry["docs"])
+    return {"answer": polish_answer(entry["raw_answer"], sources), "sources": sources, "tier": "precomputed"}
+
+
+def _extractive_response(result):
+    sources = format_sources([result["doc"]])
+    return {"answer": polish_answer(extractive.render(result), sources), "sources": sources, "tier": "extractive"}
+
+
+def _no_results_response():
+    return {
+        "answer": "I couldn’t find that in the available documents. You might want to check with the relevant office.",
+        "sources": [],
+        "tier": "none"
+    }
+
+
+def _llm_tier(raw_answer: str) -> str:
+    """Tier of an LLM-path answer: failed calls report "error", not "llm"."""
+    return "error" if raw_answer.startswith("❌") else "llm"
+
+
+def _seed_session(session, question: str, entry):
+    """Record a precomputed answer as the session's first turn so follow-ups keep its context."""
+    ids = [chunk_id(d) for d in entry["docs"]]
+    context = "\n\n".join(d.page_content for d in entry["docs"])
+    session.query_vector = entry["query_vector"]
+    session.chunk_ids = ids
+    session.chunks.update(zip(ids, entry["docs"]))
+    session.add_turn(question, PROMPT.format(context=context, question=question), entry["raw_answer"],
+                     list(dict.fromkeys(ids)))
+
+# -------------------------
+# Session Helpers
+# -------------------------
+def chunk_id(doc) -> str:
+    """Stable ID for a chunk, built from its source file and chunk number."""
+    return backends.chunk_id_for(doc.metadata)
+
+
+def format_sources(results):
+    """Source formatting for UI."""
+    return [
+        {"name": r.metadata.get("source", "Unknown"), "page": r.metadata.get("chunk", 0) + 1}
+        for r in results
+    ]
+
+
+def unit_vector(vec):
+    """Embedding as a unit-length float32 array (so dot product = cosine)."""
+    vec = np.asarray(vec, dtype="float32")
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+def _answer_in_session(db, index_dir, label, session, question: str):
+    """Answer a follow-up using the session's previous query vector and chunks."""
+    session.bind_index(label)
+    # Opening questions can be served from the precomputed store; an exact match needs no embedding
+    store = _live_answer_store(index_dir) if not session.turns else None
+    entry = store.lookup_exact(question) if store else None
+    q_vec = None
+    if store is not None and entry is None:
+        q_vec = unit_vector(db.embeddings.embed_query(question))
+        entry = store.lookup_nearest(question, q_vec)
+    if entry is not None:
+        _seed_session(session, question, entry)
+        return _precomputed_response(entry)
+
+    if q_vec is None:
+        q_vec = unit_vector(db.embeddings.embed_query(question))
+    prev_vec = session.query_vector
+
+    scored = None
+    if prev_vec is not None and session.chunk_ids and float(q_vec @ prev_vec) >= SESSION_REUSE_SIM:
+        # Same topic as last turn: reuse its chunks without searching again
+        query_vec = prev_vec
+        results = [session.chunks[cid] for cid in session.chunk_ids]
+    else:
+        # Blend the new question with the conversation so short follow-ups keep their topic
+        query_vec = q_vec if prev_vec is None else unit_vector(SESSION_BLEND * q_vec + (1 - SESSION_BLEND) * prev_vec)
+        scored = db.similarity_search_with_score_by_vector(query_vec.tolist(), k=TOP_K)
+        results = [doc for doc, _ in scored]
+
+    if not results:
+        return _no_results_response()
+
+    # Only send chunks the LLM has not already seen in this conversation
+    ids = [chunk_id(r) for r in results]
+    in_context = session.context_ids()
+    new_ids = [cid for cid in dict.fromkeys(ids) if cid not in in_context]
+    docs = dict(zip(ids, results))
+
+    # Judge the extractive tier on the question's own search, not the blended or reused conversation vector
+    fast = None
+    if extractive.EXTRACTIVE_TIER:
+        own = scored if query_vec is q_vec else db.similarity_search_with_score_by_vector(q_vec.tolist(), k=TOP_K)
+        fast = extractive.extract_answer(question, own)
+    if fast is not None:
+        # Record the quote as this turn so follow-ups still see the chunk it came from
+        own_docs = [doc for doc, _ in own]
+        session.query_vector = q_vec
+        session.chunk_ids = [chunk_id(d) for d in own_docs]
+        session.chunks.update(zip(session.chunk_ids, own_docs))
+        top = chunk_id(fast["doc"])
+        session.add_turn(question, PROMPT.format(context=fast["doc"].page_content, question=question),
+                         fast["span"], [top] if top not in in_context else [])
+        return _extractive_response(fast)
+
+    context = "\n\n".join(docs[cid].page_content for cid in new_ids)
+    if not context:
+        context = "(Same documents as earlier in this conversation.)"
+    filled_prompt = PROMPT.format(context=context, question=question)
+    raw_answer = hf_llama_inference(filled_prompt, history=session.history_messages(), index_version=label)
+
+    if not raw_answer.startswith("❌"):
+        session.query_vector = query_vec
+        session.chunk_ids = ids
+        session.chunks.update(docs)
+        session.add_turn(question, filled_prompt, raw_answer, new_ids)
+
+    sources = format_sources(results)
+    return {"answer": polish_answer(raw_answer, sources), "sources": sources, "tier": _llm_tier(raw_answer)}
+
 # -------------------------
 # Main Retrieval Function
 # -------------------------
-def answer_question(question: str):
-    """Retrieve context → run Llama → polish output."""
+def answer_question(question: str, session_id: str = None, tenant_id: str = None):
+    """Retrieve context → run Llama → polish output.
+
+    With a `session_id`, follow-up questions reuse the previous turn's
+    query vector and chunks (see `src/sessions.py`). Frequent questions are
+    answered from the precomputed store (see `src/answer_store.py`) and
+    factual lookups by quoting the top chunk (see `src/extractive.py`); the
+    returned "tier" says which path produced the answer. `tenant_id` picks
+    that college's index (see `src/tenants.py`); raises `UnknownTenant` if
+    it has none.
+    """
     try:
-        db = get_vectorstore()
-        results = db.similarity_search(question, k=5)
+        db, index_dir, label = resolve_index(tenant_id)
+        if session_id:
+            # Keyed on the pair, not a joined string, so no session_id can reach another tenant's session
+            session = sessions.get((tenant_id, session_id))
+            with session.lock:
+                return _answer_in_session(db, index_dir, label, session, question)
+
+        # Exact match needs no embedding at all; otherwise embed once for both lookup and search
+        embedding = None
+        store = _live_answer_store(index_dir)
+        entry = store.lookup_exact(question) if store else None
+        if store is not None and entry is None:
+            embedding = db.embeddings.embed_query(question)
+            entry = store.lookup_nearest(question, unit_vector(embedding))
+        if entry is not None:
+            return _precomputed_response(entry)
+
+        if embedding is None:
+            embedding = db.embeddings.embed_query(question)
+        scored = db.similarity_search_with_score_by_vector(embedding, k=TOP_K)
+        results = [doc for doc, _ in scored]
 
         if not results:
-            return {
-                "answer": "I couldn’t find that in the available documents. You might want to check with the relevant office.",
-                "sources": []
-            }
+            return _no_results_response()
+
+        # Factual lookups the top chunk answers verbatim skip the LLM
+        fast = extractive.extract_answer(question, scored)
+        if fast is not None:
+            return _extractive_response(fast)
 
         context = "\n\n".join([r.page_content for r in results])
         filled_prompt = PROMPT.format(context=context, question=question)
-        raw_answer = hf_llama_inference(filled_prompt)
+        raw_answer = hf_llama_inference(filled_prompt, index_version=label)
 
-        # Source formatting for UI
-        sources = [
-            {"name": r.metadata.get("source", "Unknown"), "page": r.metadata.get("chunk", 0) + 1}
-            for r in results
-        ]
+        sources = format_sources(results)
 
         final_answer = polish_answer(raw_answer, sources)
-        return {"answer": final_answer, "sources": sources}
+        return {"answer": final_answer, "sources": sources, "tier": _llm_tier(raw_answer)}
 
+    except (Overloaded, UnknownTenant):
+        raise  # surfaced to the API as 503 + Retry-After / 404
     except Exception as e:
         print(f"❌ Retrieval error: {e}")
         return {
             "answer": f"Sorry, something went wrong: {e}",
-            "sources": []
+            "sources": [],
+            "tier": "error"
         }
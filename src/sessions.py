@@ -0,0 +1,110 @@
+# src/sessions.py
+import os
+import time
+import threading
+from collections import OrderedDict
+
+# === Config ===
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))        # idle seconds before eviction
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "4"))  # turns kept in the LLM conversation
+
+
+class Session:
+    """State carried between turns of one conversation."""
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.query_vector = None   # last (blended) query embedding
+        self.chunk_ids = []        # chunk IDs retrieved on the last turn
+        self.chunks = {}           # chunk ID -> Document, for everything still in the conversation
+        self.turns = []            # [{"question", "prompt", "answer", "chunk_ids"}]
+        self.index_label = None    # index version the chunks above came from
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def bind_index(self, label: str):
+        """Drop retrieved chunks when the index has been swapped since the last turn.
+
+        Chunk IDs are "<source>#<chunk>" and survive a rebuild, so chunks
+        from the old version would otherwise be reused or treated as
+        already sent. The conversation text itself is kept.
+        """
+        if label == self.index_label:
+            return
+        if self.index_label is not None:
+            self.query_vector = None
+            self.chunk_ids = []
+            self.chunks = {}
+            for t in self.turns:
+                t["chunk_ids"] = []
+        self.index_label = label
+
+    def context_ids(self) -> set:
+        """Chunk IDs already sent to the LLM in the retained turns."""
+        return {cid for t in self.turns for cid in t["chunk_ids"]}
+
+    def history_messages(self) -> list:
+        """Previous turns as chat messages, oldest first."""
+        messages = []
+        for t in self.turns:
+            messages.append({"role": "user", "content": t["prompt"]})
+            messages.append({"role": "assistant", "content": t["answer"]})
+        return messages
+
+    def add_turn(self, question: str, prompt: str, answer: str, chunk_ids: list):
+        self.turns.append({"question": question, "prompt": prompt, "answer": answer, "chunk_ids": chunk_ids})
+        if len(self.turns) > SESSION_MAX_TURNS:
+            self.turns = self.turns[-SESSION_MAX_TURNS:]
+        # Forget chunks that fell out of the retained turns
+        keep = self.context_ids() | set(self.chunk_ids)
+        self.chunks = {cid: doc for cid, doc in self.chunks.items() if cid in keep}
+
+
+class SessionStore:
+    """Bounded in-memory session store with LRU + idle-timeout eviction."""
+
+    def __init__(self, max_sessions: int = SESSION_MAX, ttl: float = SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Session:
+        """Return the session for this key, creating it if needed.
+
+        The retriever keys sessions on (tenant_id, session_id), so the same
+        client ID under two tenants (or none) names two separate sessions.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            session = self._sessions.get(key)
+            if session is None:
+                session = Session(key)
+                self._sessions[key] = session
+                while len(self._sessions) > self.max_sessions:
+                    self._sessions.popitem(last=False)
+            else:
+                self._sessions.move_to_end(key)
+            session.last_used = now
+            return session
+
+    def drop(self, key):
+        with self._lock:
+            self._sessions.pop(key, None)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._sessions)
+
+    def _evict_idle(self, now: float):
+        # OrderedDict is kept in last-used order, so idle sessions sit at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_used <= self.ttl:
+                break
+            self._sessions.popitem(last=False)
+
+
+sessions = SessionStore()
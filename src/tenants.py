@@ -0,0 +1,195 @@
+# src/tenants.py
+"""
+Per-tenant indexes for serving several colleges from one deployment.
+
+Each tenant (college) has its own document set and versioned index under
+TENANTS_DIR:
+
+    tenants/<tenant_id>/raw/      source documents
+    tenants/<tenant_id>/index/    CURRENT + versions/ (same layout as FAISS_DIR)
+
+Requests name a tenant; its index is loaded on first use and kept in an
+LRU. When the loaded indexes exceed TENANT_MEMORY_MB (measured as their
+on-disk size, which tracks the in-memory size for FAISS), the least
+recently used ones are dropped. In-flight requests keep the index they
+already hold. All tenants share the one encoder the retriever loads, so
+an extra tenant costs only its index. Requests without a tenant use the
+default index in FAISS_DIR, which is always loaded and not counted.
+"""
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from src import index_versions
+from src.llm_cache import llm_cache, version_label
+
+TENANTS_DIR = os.getenv("TENANTS_DIR", "tenants")
+TENANT_MEMORY_MB = float(os.getenv("TENANT_MEMORY_MB", "1024"))
+TENANT_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_-]{0,63}$")
+
+
+class UnknownTenant(Exception):
+    """Raised for a tenant ID that is malformed or has no published index."""
+
+
+def tenant_dir(tenant_id: str, root=TENANTS_DIR) -> Path:
+    if not TENANT_ID_RE.match(tenant_id or ""):
+        raise UnknownTenant(f"Invalid tenant ID: {tenant_id!r}")
+    return Path(root) / tenant_id
+
+
+def index_root(tenant_id: str, root=TENANTS_DIR) -> Path:
+    """Versioned index directory of a tenant."""
+    return tenant_dir(tenant_id, root) / "index"
+
+
+def dir_size(path) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+class TenantIndex:
+    """One loaded tenant index version."""
+
+    def __init__(self, tenant_id: str, version: str, path: Path, db):
+        self.tenant_id = tenant_id
+        self.version = version
+        self.path = path
+        self.db = db
+        self.size_bytes = dir_size(path)
+        self.loaded_at = time.time()
+
+
+class TenantManager:
+    """LRU of loaded tenant indexes under a memory budget.
+
+    `loader(path)` loads one index version directory; the retriever passes
+    a function that reuses its shared encoder.
+    """
+
+    def __init__(self, loader, root=TENANTS_DIR, memory_mb: float = TENANT_MEMORY_MB):
+        self.loader = loader
+        self.root = Path(root)
+        self.budget_bytes = int(memory_mb * 2**20)
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._metrics = {}
+        self._failed = {}  # tenant -> version that failed to load, not retried until the pointer moves
+
+    def _tenant_metrics(self, tenant_id: str):
+        return self._metrics.setdefault(tenant_id, {
+            "warm_hits": 0, "cold_loads": 0, "evictions": 0, "reloads": 0,
+            "last_load_seconds": None, "last_used": None,
+        })
+
+    def get(self, tenant_id: str) -> TenantIndex:
+        """The tenant's live index, loading it (and evicting others) if needed."""
+        root = index_root(tenant_id, self.root)
+        with self._lock:
+            index = self._indexes.get(tenant_id)
+            if index is not None:
+                self._indexes.move_to_end(tenant_id)
+                m = self._tenant_metrics(tenant_id)
+                m["warm_hits"] += 1
+                m["last_used"] = time.time()
+                return index
+
+        # Only published tenants get a load lock, so made-up IDs cannot grow the lock table
+        if index_versions.current_version(root) is None:
+            raise UnknownTenant(f"No index published for tenant {tenant_id!r}")
+        with self._lock:
+            load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+
+        # Load outside the manager lock so one tenant's cold start does not stall the others
+        with load_lock:
+            with self._lock:
+                index = self._indexes.get(tenant_id)
+                if index is not None:  # another request loaded it while we waited
+                    self._tenant_metrics(tenant_id)["warm_hits"] += 1
+                    return index
+
+            version = index_versions.current_version(root)
+            if version is None:
+                raise UnknownTenant(f"No index published for tenant {tenant_id!r}")
+            index = self._load(tenant_id, root, version)
+            with self._lock:
+                m = self._tenant_metrics(tenant_id)
+                m["cold_loads"] += 1
+                m["last_used"] = time.time()
+                self._indexes[tenant_id] = index
+                self._evict_over_budget(keep=tenant_id)
+            return index
+
+    def _load(self, tenant_id: str, root: Path, version: str) -> TenantIndex:
+        path = index_versions.version_path(root, version)
+        start = time.perf_counter()
+        index = TenantIndex(tenant_id, version, path, self.loader(path))
+        seconds = time.perf_counter() - start
+        with self._lock:
+            self._tenant_metrics(tenant_id)["last_load_seconds"] = round(seconds, 3)
+        print(f"✅ Loaded index version {version} for tenant {tenant_id} "
+              f"({index.size_bytes / 2**20:.1f} MB, {seconds:.2f}s)")
+        llm_cache.invalidate(version_label(version, tenant_id))
+        return index
+
+    def _evict_over_budget(self, keep: str):
+        """Drop least recently used tenants until the loaded set fits the budget (caller holds the lock)."""
+        used = sum(i.size_bytes for i in self._indexes.values())
+        for tenant_id in list(self._indexes):
+            if used <= self.budget_bytes:
+                break
+            if tenant_id == keep:
+                continue
+            used -= self._indexes.pop(tenant_id).size_bytes
+            self._tenant_metrics(tenant_id)["evictions"] += 1
+            print(f"♻️ Evicted index for tenant {tenant_id} (memory budget {self.budget_bytes / 2**20:.0f} MB)")
+        if used > self.budget_bytes:
+            print(f"⚠️ Tenant {keep} alone exceeds the memory budget ({used / 2**20:.1f} MB)")
+
+    def reload_changed(self):
+        """Swap in newly published versions for tenants that are currently loaded."""
+        with self._lock:
+            loaded = list(self._indexes.values())
+        for old in loaded:
+            root = index_root(old.tenant_id, self.root)
+            version = None
+            try:
+                version = index_versions.current_version(root)
+                if version is None or version in (old.version, self._failed.get(old.tenant_id)):
+                    continue
+                index = self._load(old.tenant_id, root, version)
+            except Exception as e:
+                # Keep serving the old version
+                self._failed[old.tenant_id] = version
+                print(f"❌ Failed to reload index version {version} for tenant {old.tenant_id}: {e}")
+                continue
+            with self._lock:
+                if self._indexes.get(old.tenant_id) is old:
+                    self._indexes[old.tenant_id] = index
+                    self._tenant_metrics(old.tenant_id)["reloads"] += 1
+                    self._evict_over_budget(keep=old.tenant_id)
+
+    def stats(self):
+        with self._lock:
+            used = sum(i.size_bytes for i in self._indexes.values())
+            tenants = {}
+            for tenant_id, m in self._metrics.items():
+                index = self._indexes.get(tenant_id)
+                requests = m["warm_hits"] + m["cold_loads"]
+                tenants[tenant_id] = {
+                    **m,
+                    "loaded": index is not None,
+                    "version": index.version if index else None,
+                    "size_mb": round(index.size_bytes / 2**20, 2) if index else None,
+                    "warm_ratio": round(m["warm_hits"] / requests, 4) if requests else None,
+                }
+            return {
+                "tenants_dir": str(self.root),
+                "budget_mb": round(self.budget_bytes / 2**20, 1),
+                "used_mb": round(used / 2**20, 2),
+                "loaded": list(self._indexes),
+                "tenants": tenants,
+            }
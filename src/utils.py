@@ -91,13 +91,21 @@
 
 # src/utils.py
 # src/utils.py
-import os, re, io
+import os, re, io, time
 from pathlib import Path
 import pdfplumber  # pyright: ignore[reportMissingImports]
 from docx import Document as DocxDocument  # pyright: ignore[reportMissingImports]
-# 🧩 Initialize OCR models (optional - only if available)
+
+# "fast": PyMuPDF text layer, pdfplumber only for table-like pages
+# "pdfplumber": pdfplumber for every page (the previous behaviour)
+PDF_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "fast").lower()
+# A page with at least this many horizontal and vertical ruling lines is treated as a table
+TABLE_MIN_RULINGS = int(os.getenv("PDF_TABLE_MIN_RULINGS", "3"))
+
+# 🧩 OCR models (loaded on first scanned page, not at import)
 trocr_pipe = None
 easyocr_reader = None
+_ocr_ready = False
 OCR_AVAILABLE = False
 EASYOCR_AVAILABLE = False
 
@@ -115,8 +123,46 @@ try:
 except ImportError:
     EASYOCR_AVAILABLE = False
 
-# Initialize OCR engines - OCR is compulsory for processing all PDFs
-if OCR_AVAILABLE:
+# OCR is compulsory for processing all PDFs, so fail early if it cannot run
+if not OCR_AVAILABLE:
+    print("❌ OCR dependencies not available. OCR is required for processing all PDFs.")
+    print("   Install with: pip install transformers pillow PyMuPDF easyocr")
+    raise RuntimeError("OCR dependencies not available. OCR is compulsory for processing all PDFs.")
+
+
+def new_file_stats() -> dict:
+    """Counters that read_pdf fills in for the ingest profiling report.
+
+    "pages" gets one {"page", "method", "chars", "seconds"} entry per page,
+    where method is the text layer extractor ("pymupdf"/"pdfplumber"), the
+    OCR engine that produced the text ("trocr"/"easyocr"), or "failed".
+    """
+    return {
+        "pages": [], "text_layer_pages": 0, "ocr_pages": 0, "trocr_pages": 0, "easyocr_pages": 0,
+        "failed_pages": 0, "seconds": {},
+    }
+
+
+def _add_time(stats, key: str, seconds: float):
+    if stats is not None:
+        stats["seconds"][key] = stats["seconds"].get(key, 0.0) + seconds
+
+
+def _count(stats, key: str):
+    if stats is not None:
+        stats[key] += 1
+
+
+def _log_page(stats, page: int, method: str, text: str, seconds: float):
+    if stats is not None:
+        stats["pages"].append({"page": page, "method": method, "chars": len(text), "seconds": round(seconds, 4)})
+
+
+def init_ocr():
+    """Initialize OCR engines (TrOCR + EasyOCR) once, on first use."""
+    global trocr_pipe, easyocr_reader, _ocr_ready
+    if _ocr_ready:
+        return
     try:
         print("🧠 Initializing OCR engines (TrOCR + EasyOCR)...")
         try:
@@ -139,137 +185,203 @@ if OCR_AVAILABLE:
             if not trocr_pipe:
                 raise RuntimeError("EasyOCR not available and TrOCR failed. OCR is required.")
         
+        _ocr_ready = True
         print("✅ OCR engines ready.\n")
     except Exception as e:
         print(f"❌ OCR initialization failed: {e}")
         print("   OCR is required for processing all PDFs.")
         print("   Install dependencies: pip install transformers pillow PyMuPDF easyocr")
         raise RuntimeError("OCR initialization failed. OCR is compulsory for processing all PDFs.") from e
-else:
-    print("❌ OCR dependencies not available. OCR is required for processing all PDFs.")
-    print("   Install with: pip install transformers pillow PyMuPDF easyocr")
-    raise RuntimeError("OCR dependencies not available. OCR is compulsory for processing all PDFs.")
 
-def read_pdf(path: str) -> str:
-    """Extracts text from text-based or scanned PDFs using pdfplumber + TrOCR + EasyOCR fallback."""
+
+def ocr_page(page, i: int, stats: dict = None):
+    """OCR one PyMuPDF page: TrOCR first, EasyOCR as fallback.
+
+    Returns (text, engine) with engine "trocr" or "easyocr", or ("", None) if both fail.
+    """
+    init_ocr()
+    start = time.perf_counter()
+    pix = page.get_pixmap(dpi=200)
+    img_bytes = pix.tobytes("png")
+    img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
+    _add_time(stats, "render", time.perf_counter() - start)
+
+    # Try TrOCR first if available
+    if trocr_pipe:
+        start = time.perf_counter()
+        try:
+            trocr_result = trocr_pipe(img)
+            if trocr_result and len(trocr_result) > 0:
+                trocr_text = trocr_result[0].get("generated_text", "").strip()
+                if trocr_text and trocr_text.strip("*") != "":
+                    print(f"✅ TrOCR extracted text from page {i}")
+                    _count(stats, "trocr_pages")
+                    return trocr_text, "trocr"
+        except Exception as trocr_error:
+            print(f"⚠️  TrOCR failed on page {i}: {trocr_error}, trying EasyOCR...")
+        finally:
+            _add_time(stats, "trocr", time.perf_counter() - start)
+
+    # Fallback to EasyOCR if TrOCR failed or not available
+    if easyocr_reader:
+        start = time.perf_counter()
+        try:
+            easy_results = easyocr_reader.readtext(img_bytes, detail=0)
+            easy_text = "\n".join(easy_results or [])
+            if easy_text.strip():
+                print(f"✅ EasyOCR extracted text from page {i}")
+                _count(stats, "easyocr_pages")
+                return easy_text, "easyocr"
+        except Exception as easy_error:
+            print(f"⚠️  EasyOCR failed on page {i}: {easy_error}")
+        finally:
+            _add_time(stats, "easyocr", time.perf_counter() - start)
+    return "", None
+
+
+def looks_tabular(page) -> bool:
+    """Cheap table check on a PyMuPDF page: enough horizontal and vertical ruling lines."""
+    horizontal = vertical = 0
+    for drawing in page.get_drawings():
+        for item in drawing["items"]:
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                if abs(p1.y - p2.y) < 1:
+                    horizontal += 1
+                elif abs(p1.x - p2.x) < 1:
+                    vertical += 1
+            elif item[0] == "re":
+                # Thin rectangles are how many generators draw table borders
+                rect = item[1]
+                if rect.height < 2 and rect.width > 10:
+                    horizontal += 1
+                elif rect.width < 2 and rect.height > 10:
+                    vertical += 1
+        if horizontal >= TABLE_MIN_RULINGS and vertical >= TABLE_MIN_RULINGS:
+            return True
+    return False
+
+
+def extract_text_layer(path, extractor: str = None):
+    """
+    Per-page text from the PDF's text layer (no OCR).
+
+    Returns a list of (text, method, seconds) tuples, one per page, where
+    method is "pymupdf" or "pdfplumber". Pages with no text layer come back
+    empty.
+    """
+    extractor = (extractor or PDF_EXTRACTOR).lower()
+    pages = []
+    if extractor == "pdfplumber":
+        start = time.perf_counter()
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                text = page.extract_text() or ""
+                now = time.perf_counter()
+                pages.append((text, "pdfplumber", now - start))
+                start = now
+        return pages
+
+    plumber_pdf = None
+    try:
+        start = time.perf_counter()
+        with fitz.open(path) as doc:
+            for i, page in enumerate(doc):
+                if looks_tabular(page):
+                    # Layout-sensitive page (e.g. fee tables): keep pdfplumber's row-by-row output
+                    plumber_pdf = plumber_pdf or pdfplumber.open(path)
+                    text, method = plumber_pdf.pages[i].extract_text() or "", "pdfplumber"
+                else:
+                    text, method = page.get_text("text", sort=True), "pymupdf"
+                now = time.perf_counter()
+                pages.append((text, method, now - start))
+                start = now
+    finally:
+        if plumber_pdf is not None:
+            plumber_pdf.close()
+    return pages
+
+
+def read_pdf(path: str, extractor: str = None, stats: dict = None) -> str:
+    """
+    Extracts text from text-based or scanned PDFs: PyMuPDF/pdfplumber text layer + TrOCR/EasyOCR fallback.
+
+    Pass a dict from `new_file_stats()` as `stats` to get per-page methods,
+    counts and per-extractor timings for the ingest profiling report.
+    """
     path = Path(path)
     text = []
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
 
     try:
-        with pdfplumber.open(path) as pdf:
-            for i, page in enumerate(pdf.pages, start=1):
-                extracted = page.extract_text()
+        pages = extract_text_layer(path, extractor)
+        if stats is not None:
+            for _, method, seconds in pages:
+                _add_time(stats, method, seconds)
+        doc = None
+        try:
+            for i, (extracted, method, layer_seconds) in enumerate(pages, start=1):
                 if extracted and extracted.strip():
                     text.append(extracted)
-                else:
-                    # OCR is compulsory - always try OCR when text extraction fails
-                    print(f"🔍 OCR fallback on page {i} of {path.name}...")
-                    
-                    if not OCR_AVAILABLE:
-                        raise RuntimeError(
-                            f"OCR is required but not available. Page {i} of {path.name} has no extractable text.\n"
-                            "Install OCR dependencies: pip install transformers pillow PyMuPDF easyocr"
-                        )
-                    
-                    try:
-                        doc = fitz.open(path)
-                        page = doc.load_page(i - 1)
-                        pix = page.get_pixmap(dpi=200)
-                        img_bytes = pix.tobytes("png")
-                        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-
-                        # Try TrOCR first if available
-                        ocr_text = None
-                        if trocr_pipe:
-                            try:
-                                trocr_result = trocr_pipe(img)
-                                if trocr_result and len(trocr_result) > 0:
-                                    trocr_text = trocr_result[0].get("generated_text", "").strip()
-                                    if trocr_text and trocr_text.strip("*") != "":
-                                        text.append(trocr_text)
-                                        print(f"✅ TrOCR extracted text from page {i}")
-                                        ocr_success = True
-                                        continue
-                            except Exception as trocr_error:
-                                print(f"⚠️  TrOCR failed on page {i}: {trocr_error}, trying EasyOCR...")
-
-                        # Fallback to EasyOCR if TrOCR failed or not available
-                        if not ocr_success and easyocr_reader:
-                            try:
-                                easy_results = easyocr_reader.readtext(img_bytes, detail=0)
-                                if easy_results:
-                                    easy_text = "\n".join(easy_results)
-                                    if easy_text.strip():
-                                        text.append(easy_text)
-                                        print(f"✅ EasyOCR extracted text from page {i}")
-                                        ocr_success = True
-                                        continue
-                            except Exception as easy_error:
-                                print(f"⚠️  EasyOCR failed on page {i}: {easy_error}")
-                        
+                    _count(stats, "text_layer_pages")
+                    _log_page(stats, i, method, extracted, layer_seconds)
+                    continue
+
+                # OCR is compulsory - always try OCR when text extraction fails
+                print(f"🔍 OCR fallback on page {i} of {path.name}...")
+                _count(stats, "ocr_pages")
+                start = time.perf_counter()
+                try:
+                    doc = doc or fitz.open(path)
+                    ocr_text, engine = ocr_page(doc.load_page(i - 1), i, stats)
+                    _log_page(stats, i, engine or "failed", ocr_text, layer_seconds + time.perf_counter() - start)
+                    if ocr_text:
+                        text.append(ocr_text)
+                    else:
+                        _count(stats, "failed_pages")
                         # If both OCR methods failed, log warning but continue processing
-                        # Don't raise error - continue with next page
-                        if not ocr_success:
-                            print(f"⚠️  Both TrOCR and EasyOCR failed to extract text from page {i} of {path.name}")
-                            print(f"   The page might be blank or have unsupported image format. Continuing...")
-                            
-                    except Exception as ocr_error:
-                        error_msg = str(ocr_error)
-                        if "OCR is required" in error_msg or "Both TrOCR and EasyOCR failed" in error_msg:
-                            raise  # Re-raise critical errors
-                        print(f"⚠️  OCR error on page {i}: {error_msg}")
-                        # Try to continue with next page, but log the error
-                        print(f"   Skipping page {i} due to OCR failure")
+                        print(f"⚠️  Both TrOCR and EasyOCR failed to extract text from page {i} of {path.name}")
+                        print(f"   The page might be blank or have unsupported image format. Continuing...")
+                except Exception as ocr_error:
+                    if "OCR" in str(ocr_error) and isinstance(ocr_error, RuntimeError):
+                        raise  # Re-raise critical errors (OCR engines unavailable)
+                    print(f"⚠️  OCR error on page {i}: {ocr_error}")
+                    print(f"   Skipping page {i} due to OCR failure")
+                    _count(stats, "failed_pages")
+                    _log_page(stats, i, "failed", "", layer_seconds + time.perf_counter() - start)
+        finally:
+            if doc is not None:
+                doc.close()
 
     except Exception as e:
+        if isinstance(e, RuntimeError) and "OCR" in str(e):
+            raise
         print(f"⚠️ PDF extraction failed ({e}).")
-        if OCR_AVAILABLE:
-            print("   Attempting full OCR on all pages...")
-            try:
-                doc = fitz.open(path)
+        print("   Attempting full OCR on all pages...")
+        text = []
+        if stats is not None:
+            stats.update({k: 0 for k in ("text_layer_pages", "ocr_pages", "trocr_pages", "easyocr_pages", "failed_pages")})
+            stats["pages"] = []
+        try:
+            with fitz.open(path) as doc:
                 for i, page in enumerate(doc, start=1):
+                    _count(stats, "ocr_pages")
+                    start = time.perf_counter()
                     try:
-                        pix = page.get_pixmap(dpi=200)
-                        img_bytes = pix.tobytes("png")
-                        img = Image.open(io.BytesIO(img_bytes)).convert("RGB")
-                        
-                        # Try TrOCR first
-                        ocr_text = None
-                        if trocr_pipe:
-                            try:
-                                trocr_result = trocr_pipe(img)
-                                if trocr_result and len(trocr_result) > 0:
-                                    ocr_text = trocr_result[0].get("generated_text", "").strip()
-                                    if ocr_text and ocr_text.strip("*") != "":
-                                        text.append(ocr_text)
-                                        print(f"✅ TrOCR extracted text from page {i}")
-                                        continue
-                            except:
-                                pass
-                        
-                        # Fallback to EasyOCR
-                        if not ocr_text and easyocr_reader:
-                            try:
-                                easy_results = easyocr_reader.readtext(img_bytes, detail=0)
-                                if easy_results:
-                                    easy_text = "\n".join(easy_results)
-                                    if easy_text.strip():
-                                        text.append(easy_text)
-                                        print(f"✅ EasyOCR extracted text from page {i}")
-                            except Exception as easy_error:
-                                print(f"⚠️  EasyOCR failed on page {i}: {easy_error}")
+                        ocr_text, engine = ocr_page(page, i, stats)
+                        _log_page(stats, i, engine or "failed", ocr_text, time.perf_counter() - start)
+                        if ocr_text:
+                            text.append(ocr_text)
+                        else:
+                            _count(stats, "failed_pages")
                     except Exception as page_error:
                         print(f"⚠️  Failed to process page {i}: {page_error}")
-            except Exception as ocr_error:
-                print(f"⚠️  Full OCR also failed: {ocr_error}")
-                raise RuntimeError(f"Failed to extract text from {path.name} using both text extraction and OCR") from ocr_error
-        else:
-            raise RuntimeError(
-                f"Failed to extract text from {path.name} and OCR is not available.\n"
-                "Install OCR dependencies: pip install transformers pillow PyMuPDF easyocr"
-            ) from e
+                        _count(stats, "failed_pages")
+                        _log_page(stats, i, "failed", "", time.perf_counter() - start)
+        except Exception as ocr_error:
+            print(f"⚠️  Full OCR also failed: {ocr_error}")
+            raise RuntimeError(f"Failed to extract text from {path.name} using both text extraction and OCR") from ocr_error
 
     full_text = "\n".join(text)
     if full_text.strip():
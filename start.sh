@@ -20,7 +20,7 @@ if [ ! -f .env ]; then
 fi
 
 # Check if FAISS index exists
-if [ ! -d "faiss_index" ] || [ ! -f "faiss_index/index.faiss" ]; then
+if [ ! -f "faiss_index/CURRENT" ] && [ ! -f "faiss_index/index.faiss" ]; then
     echo "⚠️  FAISS index not found!"
     echo "📦 Building vector store..."
     python -m src.embeddings
@@ -4,7 +4,7 @@
 # This script is used by Render to start the application
 
 # Check if FAISS index exists, if not build it
-if [ ! -d "faiss_index" ] || [ ! -f "faiss_index/index.faiss" ]; then
+if [ ! -f "faiss_index/CURRENT" ] && [ ! -f "faiss_index/index.faiss" ]; then
     echo "⚠️  FAISS index not found! Building vector store..."
     python -m src.embeddings
     if [ $? -ne 0 ]; then
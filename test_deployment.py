@@ -21,6 +21,51 @@ def test_imports():
         print(f"❌ Import error: {e}")
         return False
 
+# Modules that must not be imported just to start the server
+HEAVY_MODULES = [
+    "torch", "transformers", "sentence_transformers", "chromadb", "faiss",
+    "langchain_community.vectorstores", "langchain_community.embeddings",
+]
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
+def test_import_time():
+    """Test that importing app.py stays within the startup budget."""
+    print("\n🔍 Testing import time of app.py...")
+    import subprocess
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=Path(__file__).resolve().parent, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, f"Importing app failed:\n{proc.stderr[-2000:]}"
+    
+    # Lines look like: "import time: self [us] | cumulative | imported package"
+    cumulative_us = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            cumulative_us[name.strip()] = int(cumulative)
+    
+    total_ms = cumulative_us.get("app", 0) / 1000
+    heavy = [m for m in HEAVY_MODULES if m in cumulative_us]
+    slowest = sorted(((us, m) for m, us in cumulative_us.items() if "." not in m and m != "app"), reverse=True)[:5]
+    print(f"   app import: {total_ms:.0f} ms (budget {IMPORT_BUDGET_MS:.0f} ms)")
+    print("   Slowest top-level imports: " + ", ".join(f"{m} {us / 1000:.0f} ms" for us, m in slowest))
+    
+    assert not heavy, f"Heavy modules imported at startup: {heavy}"
+    assert total_ms <= IMPORT_BUDGET_MS, f"app import took {total_ms:.0f} ms, over the {IMPORT_BUDGET_MS:.0f} ms budget"
+    print("✅ Startup imports within budget")
+
+def check_import_time():
+    """Bool wrapper around test_import_time for main()."""
+    try:
+        test_import_time()
+        return True
+    except AssertionError as e:
+        print(f"❌ {e}")
+        return False
+
 def test_health_endpoint():
     """Test the health check endpoint."""
     print("\n🔍 Testing health endpoint...")
@@ -80,10 +125,11 @@ def test_api_endpoint():
 def test_faiss_index():
     """Test if FAISS index exists."""
     print("\n🔍 Testing FAISS index...")
-    faiss_dir = Path("faiss_index")
+    from src.index_versions import current_path
+    faiss_dir = current_path("faiss_index")
     required_files = ["index.faiss", "index.pkl", "meta.pkl"]
     
-    if not faiss_dir.exists():
+    if faiss_dir is None or not faiss_dir.exists():
         print("❌ FAISS index directory not found")
         return False
     
@@ -137,6 +183,7 @@ def main():
     
     tests = [
         ("Imports", test_imports),
+        ("Import Time", check_import_time),
         ("Requirements", test_requirements),
         ("FAISS Index", test_faiss_index),
         ("Environment Variables", test_environment_variables),